@@ -0,0 +1,233 @@
+# benchmarks/hot_paths.py
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from core.memory import (
+    analytics, cluster_engine, embedding_store, keyword_index, memory_engine, session_memory, vector_index,
+)
+from core.memory.fake_client import FakeOpenAIClient
+
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_REPEAT = 5
+DEFAULT_DIM = 64  # Real embeddings are 1536-d; 64 keeps 1M-entry journals in memory
+DEFAULT_SEED = 7
+
+_WORDS = (
+    "loop mask identity fear growth anger trust silence mirror pattern father mother work "
+    "friend shame pride focus drift clarity guilt purpose habit rest anxiety hope change"
+).split()
+_TAGS = ["#insight", "#loop", "#mask", "#forge", "#trigger", ""]
+
+
+def synthetic_entries(count: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """Deterministic journal entries spread over ~1 entry per 20 minutes."""
+    rng = random.Random(seed)
+    start = time.mktime((2024, 1, 1, 8, 0, 0, 0, 0, -1))
+    entries = []
+    for i in range(count):
+        thought = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 24)))
+        response = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(12, 40)))
+        entries.append({
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + i * 1200)),
+            "thought": thought,
+            "response": response,
+            "tag": rng.choice(_TAGS),
+        })
+    return entries
+
+
+@contextlib.contextmanager
+def isolated_store(workdir: str, dim: int) -> Iterator[FakeOpenAIClient]:
+    """Point every store at `workdir` and every API call at the deterministic fake backend."""
+    client = FakeOpenAIClient(dim=dim)
+    patches = [
+        (session_memory, "MEMORY_FILE", os.path.join(workdir, "memory_store.json")),
+        (session_memory, "JOURNAL_FILE", os.path.join(workdir, "memory_store.jsonl")),
+        (embedding_store, "EMBEDDING_DB", os.path.join(workdir, "embedding_store.sqlite")),
+        (memory_engine, "ALIGNMENT_STATS_FILE", os.path.join(workdir, "alignment_stats.json")),
+        (cluster_engine, "CENTROIDS_FILE", os.path.join(workdir, "cluster_centroids.npy")),
+        (cluster_engine, "CLUSTER_META_FILE", os.path.join(workdir, "cluster_meta.json")),
+        (cluster_engine, "CLUSTER_LABELS_FILE", os.path.join(workdir, "cluster_labels.json")),
+        (cluster_engine, "EMBEDDING_DIM", dim),
+        (keyword_index, "KEYWORD_INDEX_FILE", os.path.join(workdir, "keyword_index.json")),
+        (keyword_index, "_indexes", {}),
+        (vector_index, "_journal_indexes", {}),
+        (session_memory, "_states", {}),
+    ]
+    for module in (memory_engine, cluster_engine, vector_index):
+        patches.append((module, "get_client", lambda: client))
+
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    analytics.reset_analytics_cache()
+    try:
+        yield client
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+        analytics.reset_analytics_cache()
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Wall-time percentiles over `repeat` runs, then one traced run for peak Python/NumPy memory."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples = np.array(timings)
+    return {
+        "runs": repeat,
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "min_ms": round(float(samples.min()), 3),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def bench_size(size: int, repeat: int, dim: int, seed: int) -> List[Dict[str, Any]]:
+    """Build a journal of `size` entries in a temp dir and time every hot path on it."""
+    results = []
+
+    def record(op: str, stats: Dict[str, float]) -> None:
+        results.append({"size": size, "op": op, **stats})
+
+    with tempfile.TemporaryDirectory() as workdir, isolated_store(workdir, dim):
+        session_memory.append_session_entries(synthetic_entries(size, seed))
+
+        # --- Storage
+        record("load_session_memory_cold", measure(
+            session_memory.load_session_memory, repeat, setup=session_memory._states.clear))
+        record("load_session_memory_warm", measure(session_memory.load_session_memory, repeat))
+        memory = session_memory.load_session_memory()
+
+        counter = iter(range(10**9))
+
+        def save_one_change():
+            memory[-1]["tag"] = f"#bench{next(counter)}"
+            session_memory.save_session_memory(memory)
+        record("save_session_memory", measure(save_one_change, repeat))
+        record("append_session_entry", measure(
+            lambda: session_memory.append_session_entry({"thought": "bench", "response": "bench"}), repeat))
+
+        # --- Scoring (the timed backfill embeds every entry through the fake backend)
+        memory = session_memory.load_session_memory()
+        record("calculate_alignment_score_backfill", measure(
+            lambda: memory_engine.calculate_alignment_score([dict(e) for e in memory]), 1,
+            setup=lambda: (_reset_scores(memory), _remove(memory_engine.ALIGNMENT_STATS_FILE))))
+        memory = session_memory.load_session_memory()
+        memory_engine.calculate_alignment_score(memory)
+        record("calculate_alignment_score_cached", measure(
+            lambda: memory_engine.calculate_alignment_score(memory), repeat))
+
+        # --- Clustering
+        record("fit_clusters", measure(lambda: cluster_engine.fit_clusters(memory, num_clusters=5), 1))
+        memory = session_memory.load_session_memory()
+        record("cluster_thoughts", measure(lambda: cluster_engine.cluster_thoughts(memory), repeat))
+
+        # --- Dashboard frame
+        record("build_frame", measure(lambda: analytics.build_frame(memory), repeat))
+        record("daily_alignment_cold", measure(
+            lambda: analytics.daily_alignment(memory), repeat, setup=analytics.reset_analytics_cache))
+        record("daily_alignment_warm", measure(lambda: analytics.daily_alignment(memory), repeat))
+
+        # --- Search
+        keyword_index.update_keyword_index(memory)
+        vector_index.index_entries(memory)
+        record("keyword_search", measure(lambda: keyword_index.keyword_search("loop mas", memory), repeat))
+        record("semantic_search", measure(lambda: vector_index.semantic_search("fear of change", memory, k=10), repeat))
+    return results
+
+
+def _reset_scores(memory: List[Dict[str, Any]]) -> None:
+    for entry in memory:
+        entry.pop("alignment", None)
+
+
+def _remove(path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def run(sizes: List[int] = DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT,
+        dim: int = DEFAULT_DIM, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "dim": dim,
+            "seed": seed,
+            "repeat": repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [],
+    }
+    for size in sizes:
+        report["results"].extend(bench_size(size, repeat, dim, seed))
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Operations whose p95 grew by more than `threshold`x over the baseline report."""
+    before = {(r["size"], r["op"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = before.get((result["size"], result["op"]))
+        if old and old["p95_ms"] > 0 and result["p95_ms"] > old["p95_ms"] * threshold:
+            regressions.append(
+                f"{result['op']} @ {result['size']}: p95 {old['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark journal storage, scoring, clustering and search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Journal sizes (up to 1000000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--out", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Allowed p95 slowdown factor")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, args.dim, args.seed)
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,57 @@
+# benchmarks/import_time.py
+
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules every page imports on a cold start
+MODULES = [
+    "core.memory.session_memory",
+    "core.memory.memory_engine",
+    "core.memory.cluster_engine",
+    "core.memory.vector_index",
+    "core.memory.keyword_index",
+    "gpt.gpt_handler",
+]
+
+# Libraries that must only load when their feature is used
+HEAVY_MODULES = ["sklearn", "matplotlib", "pyarrow", "openai"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure_import(module: str) -> Dict[str, object]:
+    """Import `module` in a fresh interpreter; returns wall time and heavy libraries pulled in."""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["module"] = module
+    return report
+
+
+def run(modules: List[str] = MODULES, repeat: int = 3) -> List[Dict[str, object]]:
+    """Best-of-`repeat` cold import time per module."""
+    reports = []
+    for module in modules:
+        samples = [measure_import(module) for _ in range(repeat)]
+        best = min(samples, key=lambda report: report["seconds"])
+        reports.append(best)
+    return reports
+
+
+if __name__ == "__main__":
+    for report in run():
+        loaded = ", ".join(report["loaded"]) or "-"
+        print(f"{report['module']:<32} {report['seconds'] * 1000:8.1f} ms   heavy: {loaded}")
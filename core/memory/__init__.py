@@ -1,12 +1,10 @@
 import streamlit as st
-import openai
-import os
+from gpt.client import get_client  # Shared, rate-limited client
 from core.memory.utils import save_user_profile
 from dotenv import load_dotenv
 
 # --- Setup
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # --- UI Setup
 st.set_page_config(page_title="MindForge Onboarding", layout="centered")
@@ -53,7 +51,7 @@ if st.button("⚙️ Forge My Adaptive Mirror"):
         )
 
         try:
-            response = openai.ChatCompletion.create(
+            response = get_client().chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": (
@@ -66,7 +64,7 @@ if st.button("⚙️ Forge My Adaptive Mirror"):
                 temperature=0.65,
                 max_tokens=1000
             )
-            generated_prompt = response.choices[0].message["content"]
+            generated_prompt = response.choices[0].message.content
 
             # --- Save Profile
             save_user_profile(
@@ -0,0 +1,120 @@
+# core/memory/analytics.py
+
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from core.memory.user_storage import get_current_user
+from utils.metrics import timed
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_lock = threading.Lock()
+# Process-wide analytics state per user: the typed frame plus running daily RCA sums
+_caches: Dict[str, Dict[str, Any]] = {}
+
+
+def _user_cache() -> Dict[str, Any]:
+    user_id = get_current_user()
+    if user_id not in _caches:
+        _caches[user_id] = {"frame": None, "last_id": None, "daily": None, "unscored": []}
+    return _caches[user_id]
+
+
+def build_frame(entries: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Typed columnar view of journal entries: datetime64 timestamps and dates,
+    int32 text lengths, categorical tags and float32 alignment (NaN if unscored).
+    """
+    raw = pd.DataFrame.from_records(
+        entries, columns=["id", "timestamp", "thought", "response", "tag", "alignment", "cluster"]
+    )
+    frame = pd.DataFrame({
+        "id": raw["id"],
+        "timestamp": pd.to_datetime(raw["timestamp"], format=TIMESTAMP_FORMAT, errors="coerce"),
+        "thought": raw["thought"].fillna("").astype(str),
+        "response": raw["response"].fillna("").astype(str),
+        "tag": raw["tag"].fillna("").astype(str).astype("category"),
+        "alignment": pd.to_numeric(raw["alignment"], errors="coerce").astype(np.float32),
+        "cluster": pd.to_numeric(raw["cluster"], errors="coerce").astype("Int16"),
+    })
+    frame["date"] = frame["timestamp"].dt.normalize()
+    frame["thought_len"] = frame["thought"].str.len().astype(np.int32)
+    frame["response_len"] = frame["response"].str.len().astype(np.int32)
+    return frame
+
+
+def _daily_sums(frame: pd.DataFrame) -> pd.DataFrame:
+    scored = frame.dropna(subset=["date", "alignment"])
+    return scored.groupby("date")["alignment"].agg(["sum", "count"]).astype(np.float64)
+
+
+def _append(frame: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    tags = union_categoricals([frame["tag"], new_rows["tag"]], ignore_order=True)
+    combined = pd.concat([frame, new_rows], ignore_index=True)
+    combined["tag"] = pd.Categorical(tags)
+    return combined
+
+
+def _patch_scores(cache: Dict[str, Any], frame: pd.DataFrame, memory: List[Dict[str, Any]]) -> None:
+    """Fill in alignment for rows that were unscored when cached but are scored now."""
+    still_unscored, patched = [], []
+    for row in cache["unscored"]:
+        score = memory[row].get("alignment") if row < len(memory) else None
+        (still_unscored if score is None else patched).append((row, score))
+    cache["unscored"] = [row for row, _ in still_unscored]
+    if not patched:
+        return
+    rows = [row for row, _ in patched]
+    frame.loc[rows, "alignment"] = np.array([score for _, score in patched], dtype=np.float32)
+    cache["daily"] = cache["daily"].add(_daily_sums(frame.loc[rows]), fill_value=0)
+
+
+@timed("analytics.frame")
+def get_analytics_frame(memory: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Return the analytics frame for `memory`, converting only entries added
+    since the previous call. Any other change to the journal triggers a rebuild.
+    """
+    with _lock:
+        cache = _user_cache()
+        frame = cache["frame"]
+        cached_rows = 0 if frame is None else len(frame)
+        is_prefix = (
+            frame is not None
+            and cached_rows <= len(memory)
+            and (cached_rows == 0 or memory[cached_rows - 1].get("id") == cache["last_id"])
+        )
+
+        if not is_prefix:
+            frame = build_frame(memory)
+            cache["daily"] = _daily_sums(frame)
+            cache["unscored"] = np.flatnonzero(frame["alignment"].isna().to_numpy()).tolist()
+        else:
+            _patch_scores(cache, frame, memory)
+            if cached_rows < len(memory):
+                new_rows = build_frame(memory[cached_rows:])
+                frame = _append(frame, new_rows)
+                cache["daily"] = cache["daily"].add(_daily_sums(new_rows), fill_value=0)
+                cache["unscored"] += (np.flatnonzero(new_rows["alignment"].isna().to_numpy()) + cached_rows).tolist()
+
+        cache["frame"] = frame
+        cache["last_id"] = memory[-1].get("id") if memory else None
+        return frame
+
+
+def daily_alignment(memory: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Average RCA score per day (columns: date, alignment), from the running aggregates."""
+    get_analytics_frame(memory)
+    with _lock:
+        daily = _user_cache()["daily"]
+    trend = (daily["sum"] / daily["count"]).rename("alignment").astype(np.float32)
+    return trend.rename_axis("date").reset_index().sort_values("date", ignore_index=True)
+
+
+def reset_analytics_cache() -> None:
+    with _lock:
+        _caches.clear()
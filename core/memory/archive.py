@@ -0,0 +1,139 @@
+# core/memory/archive.py
+
+import io
+from typing import Any, Dict, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from core.memory.embedding_store import EMBEDDING_DIM, EMBEDDING_MODEL, get_cached_embeddings, store_embeddings
+from core.memory.session_memory import append_session_entries
+
+CHUNK_ROWS = 10_000  # Rows per Parquet row group / Arrow record batch
+TEXT_COLUMNS = ["timestamp", "thought", "response", "tag"]
+# Columns restored on import. `cluster` is exported but not imported: its ids
+# refer to the source journal's centroids, so imported entries are reassigned.
+IMPORT_COLUMNS = TEXT_COLUMNS + ["alignment"]
+
+
+def archive_schema(dim: int = EMBEDDING_DIM) -> pa.Schema:
+    vector = pa.list_(pa.float32(), dim)  # Fixed-width embedding column
+    return pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", pa.string()),
+        ("thought", pa.string()),
+        ("response", pa.string()),
+        ("tag", pa.string()),
+        ("alignment", pa.float32()),
+        ("cluster", pa.int16()),
+        ("thought_embedding", vector),
+        ("response_embedding", vector),
+    ])
+
+
+def _vector_column(texts: List[str], dim: int) -> pa.Array:
+    """
+    Fixed-size list column from cached embeddings only (never calls the API).
+    Misses are stored as zero vectors, which no real embedding can be.
+    """
+    vectors = get_cached_embeddings(texts)
+    present = np.array([v is not None and len(v) == dim for v in vectors], dtype=bool)
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    if present.any():
+        matrix[present] = np.vstack([v for v, ok in zip(vectors, present) if ok])
+    values = pa.array(matrix.reshape(-1), type=pa.float32())
+    return pa.FixedSizeListArray.from_arrays(values, dim)
+
+
+def _batch(entries: List[Dict[str, Any]], schema: pa.Schema, dim: int) -> pa.RecordBatch:
+    columns = {name: [entry.get(name) for entry in entries] for name in ["id", "alignment", "cluster"] + TEXT_COLUMNS}
+    thoughts = [entry.get("thought") or "" for entry in entries]
+    responses = [entry.get("response") or "" for entry in entries]
+    arrays = [pa.array(columns[field.name], type=field.type) for field in schema if not field.name.endswith("_embedding")]
+    arrays += [_vector_column(thoughts, dim), _vector_column(responses, dim)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_archive(entries: List[Dict[str, Any]], fmt: str = "parquet", dim: int = EMBEDDING_DIM) -> bytes:
+    """
+    Serialize entries (with alignment scores and cached embeddings) to
+    Parquet or Arrow IPC, streaming CHUNK_ROWS rows at a time into the buffer.
+    """
+    schema = archive_schema(dim)
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        write = writer.write_batch
+    elif fmt == "arrow":
+        writer = ipc.new_file(sink, schema)
+        write = writer.write_batch
+    else:
+        raise ValueError(f"Unsupported archive format: {fmt}")
+
+    with writer:
+        for start in range(0, len(entries), CHUNK_ROWS):
+            write(_batch(entries[start:start + CHUNK_ROWS], schema, dim))
+    return sink.getvalue()
+
+
+def read_archive(data: bytes) -> pa.Table:
+    """Read a Parquet or Arrow IPC archive produced by export_archive."""
+    if data[:4] == b"PAR1":
+        return pq.read_table(io.BytesIO(data))
+    return ipc.open_file(io.BytesIO(data)).read_all()
+
+
+def _store_vectors(table: pa.Table, text_column: str, vector_column: str) -> None:
+    """Bulk-load archived (non-zero) embedding rows into the embedding store."""
+    if vector_column not in table.column_names:
+        return
+    column = table.column(vector_column).combine_chunks()
+    matrix = column.values.to_numpy(zero_copy_only=False).reshape(-1, column.type.list_size)
+    valid = np.any(matrix != 0, axis=1)
+    if not valid.any():
+        return
+    matrix = matrix[valid]
+    texts = np.asarray(table.column(text_column).to_pylist(), dtype=object)[valid]
+    store_embeddings(list(texts), matrix, EMBEDDING_MODEL)
+
+
+def _entries_from_columns(table: pa.Table) -> List[Dict[str, Any]]:
+    """
+    Journal entries built one column at a time: nulls are dropped per column
+    with an is_valid mask, so missing values never become keys. The journal
+    stores one JSON object per entry, so the final per-entry dicts remain.
+    """
+    entries: List[Dict[str, Any]] = [{} for _ in range(table.num_rows)]
+    for name in IMPORT_COLUMNS:
+        if name not in table.column_names:
+            continue
+        column = table.column(name)
+        if name == "alignment":
+            column = pc.round(column.cast(pa.float64()), 3)  # Scores are stored to 3 places
+        valid = pc.is_valid(column)
+        rows = np.flatnonzero(valid.to_numpy(zero_copy_only=False))
+        for row, value in zip(rows.tolist(), column.filter(valid).to_pylist()):
+            entries[row][name] = value
+    return entries
+
+
+def import_archive(data: bytes) -> int:
+    """
+    Append every row of an archive to the journal (new ids are assigned) and
+    seed the embedding store with the archived vectors. Returns rows imported.
+    Archived cluster ids are dropped; the entries are clustered against this
+    journal's centroids on the next clustering pass.
+    """
+    table = read_archive(data)
+    if table.num_rows == 0:
+        return 0
+
+    _store_vectors(table, "thought", "thought_embedding")
+    _store_vectors(table, "response", "response_embedding")
+
+    entries = _entries_from_columns(table)
+    append_session_entries(entries)  # One write and fsync for the whole archive
+    return len(entries)
@@ -1,46 +1,214 @@
 # core/memory/cluster_engine.py
 
-from openai import OpenAI
-from sklearn.cluster import KMeans
-from typing import List, Dict
+import contextvars
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 import numpy as np
+from core.memory.embedding_store import get_embedding as get_stored_embedding, get_embeddings, EMBEDDING_DIM
+from core.memory.session_memory import load_session_memory, update_session_entries
+from core.memory.user_storage import ensure_parent_dir, get_current_user, shard_lock, user_file
+from gpt.client import get_client
+from utils.file_cache import load_cached, load_json_cached
+from utils.metrics import timed
 
-# Initialize OpenAI client
-client = OpenAI()
+CENTROIDS_FILE = os.path.join(os.path.dirname(__file__), "cluster_centroids.npy")
+CLUSTER_META_FILE = os.path.join(os.path.dirname(__file__), "cluster_meta.json")
+CLUSTER_LABELS_FILE = os.path.join(os.path.dirname(__file__), "cluster_labels.json")
+REFIT_EVERY = 50  # Incremental assignments before a background refit
+LABEL_DRIFT_THRESHOLD = 0.25  # Jaccard distance of membership that triggers relabeling
+MAX_LABEL_WORKERS = 8
+
+_refit_locks: Dict[str, threading.Lock] = {}  # One background refit per user at a time
+_refit_guard = threading.Lock()
 
 def get_embedding(text: str) -> List[float]:
     """
-    Generate embedding vector for a given thought.
+    Generate embedding vector for a given thought, reusing the on-disk embedding store.
     Falls back to zero vector on error.
     """
     try:
-        result = client.embeddings.create(
-            input=text,
-            model="text-embedding-3-small"
-        )
-        return result.data[0].embedding
+        vector = get_stored_embedding(text, get_client())
+    except Exception:
+        vector = None
+    if vector is None:
+        return [0.0] * EMBEDDING_DIM  # Fallback for failed embedding
+    return vector.tolist()
+
+def _thought_vectors(entries: List[Dict[str, Any]]) -> List[Optional[np.ndarray]]:
+    """Thought embeddings for entries; None where embedding failed."""
+    try:
+        return get_embeddings([entry["thought"] for entry in entries], get_client())
     except Exception:
-        return [0.0] * 1536  # Fallback for failed embedding
+        return [None] * len(entries)
+
+def _thought_matrix(entries: List[Dict[str, Any]]) -> np.ndarray:
+    """Stack float32 thought embeddings for entries, using zero rows for failures."""
+    zero = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    return np.vstack([zero if vector is None else vector for vector in _thought_vectors(entries)])
+
+# --- Persisted Centroids
+
+def load_centroids() -> Optional[np.ndarray]:
+    """Load the persisted (k, D) centroid matrix, or None if no model was fitted yet."""
+    try:
+        return load_cached(user_file(CENTROIDS_FILE), np.load)
+    except OSError:
+        return None
+
+def _save_centroids(centroids: np.ndarray) -> None:
+    path = ensure_parent_dir(user_file(CENTROIDS_FILE))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, centroids.astype(np.float32))
+    os.replace(tmp_path, path)
+
+def _load_meta() -> Dict[str, Any]:
+    meta = load_json_cached(user_file(CLUSTER_META_FILE))
+    return meta if isinstance(meta, dict) else {"since_refit": 0}
+
+def _save_meta(meta: Dict[str, Any]) -> None:
+    path = ensure_parent_dir(user_file(CLUSTER_META_FILE))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+
+def _persist_assignments(entries: List[Dict[str, Any]]) -> None:
+    """Store cluster ids on journal entries (one batched append)."""
+    update_session_entries([(entry["id"], {"cluster": entry["cluster"]}) for entry in entries if "id" in entry])
+
+# --- Fitting and Assignment
+
+@timed("cluster.fit")
+def fit_clusters(memory: List[Dict[str, Any]], num_clusters: int = 5) -> Optional[np.ndarray]:
+    """
+    Fit MiniBatchKMeans over every thought, persist the centroids and store
+    each entry's cluster id. Returns the centroid matrix (None if too few entries).
+    """
+    valid_entries = [entry for entry in memory if entry.get("thought")]
+    if len(valid_entries) < 2:
+        return None
+
+    from sklearn.cluster import MiniBatchKMeans  # Deferred: sklearn is only needed when fitting
+
+    embeddings = _thought_matrix(valid_entries)
+    n_clusters = min(num_clusters, len(valid_entries))
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init="auto", batch_size=1024)
+    labels = kmeans.fit_predict(embeddings)
+
+    for entry, label in zip(valid_entries, labels):
+        entry["cluster"] = int(label)
+    _save_centroids(kmeans.cluster_centers_)
+    _save_meta({"n_clusters": n_clusters, "since_refit": 0, "fitted_on": len(valid_entries)})
+    _persist_assignments(valid_entries)
+    return kmeans.cluster_centers_
+
+def nearest_clusters(embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid for each row, O(k·D) per row."""
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    distances = (
+        (embeddings ** 2).sum(axis=1)[:, None]
+        - 2.0 * embeddings @ centroids.T
+        + (centroids ** 2).sum(axis=1)[None, :]
+    )
+    return distances.argmin(axis=1)
+
+def assign_cluster(embedding: List[float]) -> Optional[int]:
+    """Assign a single embedding to the nearest persisted centroid."""
+    centroids = load_centroids()
+    if centroids is None:
+        return None
+    return int(nearest_clusters(embedding, centroids)[0])
+
+def refit_clusters_async(num_clusters: int = 5) -> bool:
+    """Refit the current user's journal on a background thread (skipped if one is running)."""
+    with _refit_guard:
+        refit_lock = _refit_locks.setdefault(get_current_user(), threading.Lock())
+    if not refit_lock.acquire(blocking=False):
+        return False
+
+    def _run():
+        try:
+            fit_clusters(load_session_memory(), num_clusters)
+        finally:
+            refit_lock.release()
+
+    context = contextvars.copy_context()  # The thread keeps writing to this user's shard
+    threading.Thread(target=context.run, args=(_run,), name="cluster-refit", daemon=True).start()
+    return True
 
+def assign_entry_cluster(entry: Dict[str, Any]) -> Optional[int]:
+    """
+    Incrementally place a newly saved entry into an existing cluster and
+    persist the assignment. Schedules a background refit every REFIT_EVERY entries.
+    Returns None, leaving the entry unassigned, when its embedding is unavailable.
+    """
+    if not entry.get("thought"):
+        return None
+    try:
+        embedding = get_stored_embedding(entry["thought"], get_client())
+    except Exception:
+        embedding = None
+    if embedding is None:
+        return None  # A zero-vector fallback would pin the entry to an arbitrary cluster
+    cluster = assign_cluster(embedding)
+    if cluster is None:
+        return None
+
+    entry["cluster"] = cluster
+    _persist_assignments([entry])
+
+    with shard_lock(user_file(CLUSTER_META_FILE)):
+        meta = _load_meta()
+        meta["since_refit"] = meta.get("since_refit", 0) + 1
+        _save_meta(meta)
+    if meta["since_refit"] >= REFIT_EVERY:
+        refit_clusters_async(meta.get("n_clusters", 5))
+    return cluster
+
+def group_by_cluster(memory: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+    """Group entries by their stored cluster id without any recomputation."""
+    clusters: Dict[int, List[Dict[str, Any]]] = {}
+    for entry in memory:
+        if "cluster" in entry:
+            clusters.setdefault(entry["cluster"], []).append(entry)
+    return clusters
+
+@timed("cluster.group")
 def cluster_thoughts(memory: List[Dict[str, str]], num_clusters: int = 5) -> Dict[int, List[Dict[str, str]]]:
     """
     Cluster memory entries based on semantic similarity of thoughts.
     Returns a dict of {cluster_id: [entries]}.
+
+    Uses stored assignments when every entry has one; unassigned entries are
+    placed against the persisted centroids, and a full fit happens only when
+    no compatible model exists yet.
     """
     valid_entries = [entry for entry in memory if entry.get("thought")]
     if len(valid_entries) < 2:
         return {0: valid_entries} if valid_entries else {}
 
-    embeddings = [get_embedding(entry["thought"]) for entry in valid_entries]
     n_clusters = min(num_clusters, len(valid_entries))
-
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init="auto")
-    labels = kmeans.fit_predict(embeddings)
+    centroids = load_centroids()
+    if centroids is None or len(centroids) != n_clusters:
+        fit_clusters(valid_entries, n_clusters)
+    else:
+        unassigned = [entry for entry in valid_entries if "cluster" not in entry]
+        embedded = [(entry, vector) for entry, vector in zip(unassigned, _thought_vectors(unassigned))
+                    if vector is not None]  # Entries that failed to embed stay unassigned
+        if embedded:
+            labels = nearest_clusters(np.vstack([vector for _, vector in embedded]), centroids)
+            for (entry, _), label in zip(embedded, labels):
+                entry["cluster"] = int(label)
+            _persist_assignments([entry for entry, _ in embedded])
 
     clusters = {i: [] for i in range(n_clusters)}
-    for i, label in enumerate(labels):
-        clusters[label].append(valid_entries[i])
-
+    for cluster_id, entries in group_by_cluster(valid_entries).items():
+        clusters.setdefault(cluster_id, []).extend(entries)
     return clusters
 
 def generate_cluster_label(thoughts: List[str]) -> str:
@@ -58,7 +226,7 @@ def generate_cluster_label(thoughts: List[str]) -> str:
     )
 
     try:
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are a concise cluster labeling assistant."},
@@ -70,3 +238,84 @@ def generate_cluster_label(thoughts: List[str]) -> str:
         return response.choices[0].message.content.strip()
     except Exception:
         return "Unknown"
+
+# --- Cached Cluster Labels
+
+def _member_ids(entries: List[Dict[str, Any]]) -> List[Any]:
+    return sorted((entry.get("id", entry.get("timestamp")) for entry in entries), key=str)
+
+def membership_fingerprint(entries: List[Dict[str, Any]]) -> str:
+    """Stable hash of a cluster's member entry ids."""
+    return hashlib.sha1(json.dumps(_member_ids(entries), default=str).encode("utf-8")).hexdigest()
+
+def membership_drift(old_members: List[Any], new_members: List[Any]) -> float:
+    """Jaccard distance between two membership lists (0 = identical, 1 = disjoint)."""
+    old_set, new_set = {str(m) for m in old_members}, {str(m) for m in new_members}
+    union = old_set | new_set
+    if not union:
+        return 0.0
+    return 1.0 - len(old_set & new_set) / len(union)
+
+def _label_is_fresh(record: Optional[Dict[str, Any]], entries: List[Dict[str, Any]]) -> bool:
+    return bool(record) and (
+        record.get("fingerprint") == membership_fingerprint(entries)
+        or membership_drift(record.get("members", []), _member_ids(entries)) <= LABEL_DRIFT_THRESHOLD
+    )
+
+def cached_cluster_labels(clusters: Dict[int, List[Dict[str, Any]]]) -> Dict[int, str]:
+    """
+    Return {cluster_id: label} for clusters whose persisted label is still
+    fresh; never calls the API. Missing ids need a "labels" job.
+    """
+    cached = load_json_cached(user_file(CLUSTER_LABELS_FILE), default={})
+    return {
+        cluster_id: cached[str(cluster_id)]["label"]
+        for cluster_id, entries in clusters.items()
+        if _label_is_fresh(cached.get(str(cluster_id)), entries)
+    }
+
+@timed("cluster.label")
+def label_clusters(clusters: Dict[int, List[Dict[str, Any]]]) -> Dict[int, str]:
+    """
+    Return {cluster_id: label}, reusing labels persisted in cluster_labels.json.
+    A cluster is relabeled only when its membership drifted past
+    LABEL_DRIFT_THRESHOLD; pending relabels run concurrently.
+    """
+    labels_path = user_file(CLUSTER_LABELS_FILE)
+    cached = load_json_cached(labels_path, default={})
+    labels: Dict[int, str] = {}
+    stale: Dict[int, List[Dict[str, Any]]] = {}
+
+    for cluster_id, entries in clusters.items():
+        if _label_is_fresh(cached.get(str(cluster_id)), entries):
+            labels[cluster_id] = cached[str(cluster_id)]["label"]
+        else:
+            stale[cluster_id] = entries
+
+    if not stale:
+        return labels
+
+    with ThreadPoolExecutor(max_workers=min(MAX_LABEL_WORKERS, len(stale))) as pool:
+        futures = {
+            # Pool threads don't inherit contextvars: run each label call in a copy of
+            # the caller's context so it keeps the caller's user and API priority lane
+            cluster_id: pool.submit(contextvars.copy_context().run, generate_cluster_label,
+                                    [entry["thought"] for entry in entries])
+            for cluster_id, entries in stale.items()
+        }
+        for cluster_id, future in futures.items():
+            labels[cluster_id] = future.result()
+
+    for cluster_id, entries in stale.items():
+        if labels[cluster_id] in ("Unknown", "Unlabeled"):
+            continue  # Don't pin a failed or empty label
+        cached[str(cluster_id)] = {
+            "label": labels[cluster_id],
+            "fingerprint": membership_fingerprint(entries),
+            "members": _member_ids(entries),
+        }
+    tmp_path = ensure_parent_dir(labels_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cached, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, labels_path)
+    return labels
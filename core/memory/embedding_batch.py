@@ -0,0 +1,74 @@
+# core/memory/embedding_batch.py
+
+from typing import List, Optional
+
+# Limits for a single embeddings request (the API caps inputs at 2048 per call)
+MAX_BATCH_INPUTS = 2048
+MAX_BATCH_TOKENS = 250_000
+MAX_INPUT_TOKENS = 8191
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def chunk_texts(texts: List[str], max_tokens: int = MAX_BATCH_TOKENS,
+                max_inputs: int = MAX_BATCH_INPUTS) -> List[List[int]]:
+    """
+    Group text indices into chunks bounded by estimated tokens and input count.
+    Each chunk becomes one embeddings request.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = min(estimate_tokens(text), MAX_INPUT_TOKENS)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def embed_in_batches(texts: List[str], client, model: str,
+                     max_tokens: int = MAX_BATCH_TOKENS,
+                     max_inputs: int = MAX_BATCH_INPUTS) -> List[Optional[List[float]]]:
+    """
+    Embed `texts` with one request per chunk and map vectors back by position.
+    Texts in a failed chunk come back as None.
+    """
+    results: List[Optional[List[float]]] = [None] * len(texts)
+    for chunk in chunk_texts(texts, max_tokens, max_inputs):
+        try:
+            response = client.embeddings.create(input=[texts[i] for i in chunk], model=model)
+        except Exception:
+            continue
+        for position, item in enumerate(response.data):
+            offset = getattr(item, "index", position)
+            results[chunk[offset]] = item.embedding
+    return results
+
+
+if __name__ == "__main__":
+    # Offline benchmark: per-text requests vs batched requests against the fake client
+    import time
+    from core.memory.embedding_store import EMBEDDING_MODEL
+    from core.memory.fake_client import FakeOpenAIClient
+
+    sample = [f"Reflection number {i} about recursion and identity." for i in range(500)]
+
+    single = FakeOpenAIClient(latency=0.002)
+    start = time.perf_counter()
+    for text in sample:
+        single.embeddings.create(input=text, model=EMBEDDING_MODEL)
+    single_time = time.perf_counter() - start
+
+    batched = FakeOpenAIClient(latency=0.002)
+    start = time.perf_counter()
+    embed_in_batches(sample, batched, EMBEDDING_MODEL)
+    batched_time = time.perf_counter() - start
+
+    print(f"per-text: {single.request_count} requests in {single_time:.3f}s")
+    print(f"batched:  {batched.request_count} requests in {batched_time:.3f}s")
@@ -0,0 +1,109 @@
+# core/memory/embedding_store.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from core.memory.embedding_batch import embed_in_batches
+from utils.metrics import span
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+EMBEDDING_DB = os.path.join(os.path.dirname(__file__), "embedding_store.sqlite")
+
+_lock = threading.Lock()
+_conn = None
+_conn_path = None
+
+
+def embedding_key(text: str, model: str = EMBEDDING_MODEL) -> str:
+    """Content address for an embedding: sha256 of (model, text)."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open (or reuse) the shared sqlite connection for the embedding store."""
+    global _conn, _conn_path
+    if _conn is None or _conn_path != EMBEDDING_DB:
+        if _conn is not None:
+            _conn.close()
+        _conn = sqlite3.connect(EMBEDDING_DB, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+        )
+        _conn_path = EMBEDDING_DB
+    return _conn
+
+
+def get_cached_embeddings(texts: List[str], model: str = EMBEDDING_MODEL) -> List[Optional[np.ndarray]]:
+    """
+    Look up stored float32 vectors for each text.
+    Returns a list aligned with `texts`, with None for cache misses.
+    """
+    keys = [embedding_key(text, model) for text in texts]
+    found = {}
+    with _lock:
+        conn = _connect()
+        unique = list(set(keys))
+        for start in range(0, len(unique), 500):  # stay under sqlite's variable limit
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+    return [found.get(key) for key in keys]
+
+
+def store_embeddings(texts: List[str], vectors: List[List[float]], model: str = EMBEDDING_MODEL) -> None:
+    """Persist vectors for the given texts as float32 BLOBs."""
+    rows = []
+    for text, vector in zip(texts, vectors):
+        arr = np.asarray(vector, dtype=np.float32)
+        rows.append((embedding_key(text, model), model, int(arr.shape[0]), arr.tobytes()))
+    if not rows:
+        return
+    with _lock:
+        conn = _connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)", rows
+            )
+
+
+def get_embeddings(texts: List[str], client, model: str = EMBEDDING_MODEL) -> List[Optional[np.ndarray]]:
+    """
+    Return embeddings for `texts`, calling the API only for texts never seen before.
+    Cache misses are sent in token-bounded batches, one request per chunk.
+    Failed lookups come back as None and are not cached.
+    """
+    with span("embeddings.get") as s:
+        results = get_cached_embeddings(texts, model)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, results) if vector is None))
+        s.set(cache_hits=len(texts) - sum(vector is None for vector in results), cache_misses=len(missing))
+
+        fetched = {}
+        if missing:
+            for text, vector in zip(missing, embed_in_batches(missing, client, model)):
+                if vector is not None:
+                    fetched[text] = vector
+
+        if fetched:
+            store_embeddings(list(fetched), list(fetched.values()), model)
+            for i, vector in enumerate(results):
+                if vector is None and texts[i] in fetched:
+                    results[i] = np.asarray(fetched[texts[i]], dtype=np.float32)
+
+        return results
+
+
+def get_embedding(text: str, client, model: str = EMBEDDING_MODEL) -> Optional[np.ndarray]:
+    """Single-text convenience wrapper around get_embeddings."""
+    return get_embeddings([text], client, model)[0]
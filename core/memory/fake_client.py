@@ -0,0 +1,61 @@
+# core/memory/fake_client.py
+
+import hashlib
+import time
+from types import SimpleNamespace
+from typing import List, Union
+
+import numpy as np
+
+from core.memory.embedding_store import EMBEDDING_DIM
+
+
+def fake_vector(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """Deterministic unit vector derived from the text's hash."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeOpenAIClient:
+    """
+    Offline stand-in for OpenAI() used by tests and benchmarks.
+    Mirrors the `embeddings.create` and `chat.completions.create` call shapes
+    and records how many requests were made.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.request_count = 0
+        self.input_count = 0
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+
+    def _create_embeddings(self, input: Union[str, List[str]], model: str, **kwargs):
+        self.request_count += 1
+        inputs = [input] if isinstance(input, str) else list(input)
+        self.input_count += len(inputs)
+        if self.latency:
+            time.sleep(self.latency)
+        data = [
+            SimpleNamespace(index=i, embedding=fake_vector(text, self.dim), object="embedding")
+            for i, text in enumerate(inputs)
+        ]
+        return SimpleNamespace(data=data, model=model)
+
+    def _create_chat(self, model: str, messages: list, stream: bool = False, **kwargs):
+        self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        content = f"Reflection on: {messages[-1]['content'][:200]}"
+        if stream:
+            return self._stream_chat(content, model)
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")], model=model)
+
+    def _stream_chat(self, content: str, model: str):
+        for word in content.split(" "):
+            delta = SimpleNamespace(content=word + " ")
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)], model=model)
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=None), finish_reason="stop")], model=model)
@@ -0,0 +1,287 @@
+# core/memory/job_queue.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from core.memory.cluster_engine import assign_entry_cluster, group_by_cluster, label_clusters
+from core.memory.keyword_index import update_keyword_index
+from core.memory.memory_engine import calculate_alignment_score, score_entry, update_alignment_stats
+from core.memory.session_memory import get_session_entry, load_session_memory, update_session_entry
+from core.memory.user_storage import get_current_user, normalize_user_id, user_context
+from core.memory.vector_index import index_entry
+from gpt.client import BACKGROUND, request_priority
+
+JOBS_DB = os.path.join(os.path.dirname(__file__), "jobs.sqlite")
+JOB_WORKERS = int(os.getenv("MINDFORGE_JOB_WORKERS", "2"))
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 5.0  # Seconds before a failed job is retried (doubles per attempt)
+JOB_LEASE_SECONDS = 300  # A running job older than this is assumed orphaned by a dead worker
+POLL_INTERVAL = 1.0
+JOB_RETENTION_SECONDS = 7 * 24 * 3600  # Finished jobs older than this are deleted
+PRUNE_INTERVAL = 3600.0  # Seconds between prune passes by idle workers
+
+# UPDATE ... RETURNING needs SQLite 3.35+; older libraries claim inside BEGIN IMMEDIATE instead
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+_lock = threading.Lock()
+_conn = None
+_conn_path = None
+
+_last_prune = 0.0
+
+_wakeup = threading.Event()
+_workers: List[threading.Thread] = []
+_workers_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open (or reuse) the shared autocommit connection to the job table."""
+    global _conn, _conn_path
+    if _conn is None or _conn_path != JOBS_DB:
+        if _conn is not None:
+            _conn.close()
+        _conn = sqlite3.connect(JOBS_DB, check_same_thread=False, isolation_level=None, timeout=30)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, kind TEXT NOT NULL, "
+            "entry_id INTEGER, payload TEXT NOT NULL DEFAULT '{}', status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, run_after REAL NOT NULL, "
+            "claimed_at REAL, created_at REAL NOT NULL, finished_at REAL)"
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after)")
+        _conn.execute("CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user_id, status)")
+        if _conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            # The default store's id used to be "default"; it is now "" (see user_storage)
+            _conn.execute("UPDATE jobs SET user_id = '' WHERE user_id = 'default'")
+            _conn.execute("PRAGMA user_version = 1")
+        _conn_path = JOBS_DB
+    return _conn
+
+
+# --- Producers
+
+def enqueue_job(kind: str, entry_id: Optional[int] = None, payload: Optional[Dict[str, Any]] = None,
+                user_id: Optional[str] = None, dedupe: bool = False) -> Optional[int]:
+    """
+    Persist a job for the current (or given) user and wake the workers.
+    With `dedupe`, nothing is added if an identical job is still pending.
+    Returns the job id (None when deduplicated).
+    """
+    user_id = normalize_user_id(get_current_user() if user_id is None else user_id)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        if dedupe:
+            existing = conn.execute(
+                "SELECT id FROM jobs WHERE user_id = ? AND kind = ? AND entry_id IS ? AND status = ?",
+                (user_id, kind, entry_id, PENDING),
+            ).fetchone()
+            if existing:
+                return None
+        cursor = conn.execute(
+            "INSERT INTO jobs (user_id, kind, entry_id, payload, status, run_after, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user_id, kind, entry_id, json.dumps(payload or {}), PENDING, now, now),
+        )
+        job_id = cursor.lastrowid
+    _wakeup.set()
+    return job_id
+
+
+def enqueue_entry(entry: Dict[str, Any]) -> Optional[int]:
+    """Schedule embedding, scoring, clustering and indexing for a saved entry."""
+    return enqueue_job("entry", entry_id=entry["id"])
+
+
+# --- Status (read by the UI)
+
+def pending_entry_ids(user_id: Optional[str] = None) -> Set[int]:
+    """Ids of the user's entries whose processing has not finished yet."""
+    user_id = normalize_user_id(get_current_user() if user_id is None else user_id)
+    with _lock:
+        rows = _connect().execute(
+            "SELECT entry_id FROM jobs WHERE user_id = ? AND kind = 'entry' AND status IN (?, ?)",
+            (user_id, PENDING, RUNNING),
+        ).fetchall()
+    return {row[0] for row in rows}
+
+
+def job_counts(user_id: Optional[str] = None) -> Dict[str, int]:
+    """{status: count} of the user's jobs."""
+    user_id = normalize_user_id(get_current_user() if user_id is None else user_id)
+    with _lock:
+        rows = _connect().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE user_id = ? GROUP BY status", (user_id,)
+        ).fetchall()
+    return {status: count for status, count in rows}
+
+
+# --- Workers
+
+def _claim() -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the oldest ready job (or one whose lease expired).
+    A single UPDATE ... RETURNING (or, on SQLite < 3.35, a SELECT and UPDATE
+    under a write lock), so concurrent processes never share a job.
+    """
+    now = time.time()
+    ready = ("SELECT id FROM jobs WHERE (status = ? AND run_after <= ?) OR (status = ? AND claimed_at < ?) "
+             "ORDER BY id LIMIT 1")
+    ready_args = (PENDING, now, RUNNING, now - JOB_LEASE_SECONDS)
+    columns = "id, user_id, kind, entry_id, payload, attempts"
+    with _lock:
+        conn = _connect()
+        if HAS_RETURNING:
+            row = conn.execute(
+                f"UPDATE jobs SET status = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ({ready}) "
+                f"RETURNING {columns}",
+                (RUNNING, now) + ready_args,
+            ).fetchone()
+        else:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                found = conn.execute(ready, ready_args).fetchone()
+                row = None
+                if found is not None:
+                    conn.execute("UPDATE jobs SET status = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                                 (RUNNING, now, found[0]))
+                    row = conn.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (found[0],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    if row is None:
+        return None
+    keys = ["id", "user_id", "kind", "entry_id", "payload", "attempts"]
+    job = dict(zip(keys, row))
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def _finish(job: Dict[str, Any], error: Optional[str] = None) -> None:
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        if error is None:
+            conn.execute("UPDATE jobs SET status = ?, error = NULL, finished_at = ? WHERE id = ?",
+                         (DONE, now, job["id"]))
+        elif job["attempts"] < MAX_ATTEMPTS:
+            retry_at = now + RETRY_DELAY * (2 ** (job["attempts"] - 1))
+            conn.execute("UPDATE jobs SET status = ?, error = ?, run_after = ? WHERE id = ?",
+                         (PENDING, error, retry_at, job["id"]))
+        else:
+            conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                         (FAILED, error, now, job["id"]))
+
+
+def prune_jobs(older_than: float = JOB_RETENTION_SECONDS) -> int:
+    """Delete jobs that finished successfully more than `older_than` seconds ago. Returns rows removed."""
+    global _last_prune
+    cutoff = time.time() - older_than
+    with _lock:
+        removed = _connect().execute(
+            "DELETE FROM jobs WHERE status = ? AND finished_at < ?", (DONE, cutoff)
+        ).rowcount
+        _last_prune = time.time()
+    return removed
+
+
+def run_next() -> bool:
+    """
+    Run one ready job in its user's context, in the background API lane so
+    interactive chat is served first. Returns False if none was ready.
+    """
+    job = _claim()
+    if job is None:
+        return False
+    handler = JOB_HANDLERS.get(job["kind"])
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job['kind']}")
+        with user_context(job["user_id"]), request_priority(BACKGROUND):
+            handler(job)
+    except Exception as e:
+        _finish(job, error=f"{type(e).__name__}: {e}")
+    else:
+        _finish(job)
+    return True
+
+
+def run_pending(limit: Optional[int] = None) -> int:
+    """Drain ready jobs on the calling thread (tests, scripts). Returns jobs run."""
+    count = 0
+    while (limit is None or count < limit) and run_next():
+        count += 1
+    return count
+
+
+def _worker_loop() -> None:
+    while True:
+        try:
+            if run_next():
+                continue
+            if time.time() - _last_prune >= PRUNE_INTERVAL:
+                prune_jobs()  # Keep the table bounded; failed jobs stay for inspection
+        except Exception:
+            pass  # Job table briefly locked or unreadable; try again after the poll interval
+        _wakeup.wait(POLL_INTERVAL)
+        _wakeup.clear()
+
+
+def start_workers(count: int = JOB_WORKERS) -> None:
+    """Start the process-wide worker threads once (idempotent across reruns)."""
+    with _workers_lock:
+        _workers[:] = [worker for worker in _workers if worker.is_alive()]
+        for i in range(len(_workers), count):
+            worker = threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+# --- Job Handlers
+
+def process_entry(job: Dict[str, Any]) -> None:
+    """
+    Post-save pipeline for one entry: embed and score it, fold the score into
+    the running RCA mean, place it in a cluster and add it to the search indexes.
+    Steps already recorded on the entry are skipped, so a retried job is safe;
+    an embedding failure raises, leaving the entry unscored until the retry.
+    """
+    entry = get_session_entry(job["entry_id"])
+    if entry is None:
+        return  # Entry was removed before the job ran
+
+    if "alignment" not in entry:
+        score = score_entry(entry)  # Embeds thought + response (cached for the steps below)
+        update_session_entry(entry["id"], {"alignment": score})
+        update_alignment_stats(score, entry["id"])
+    if "cluster" not in entry and assign_entry_cluster(entry) is not None:
+        enqueue_job("labels", dedupe=True)
+    index_entry(entry)
+    update_keyword_index([entry])
+
+
+def refresh_labels(job: Dict[str, Any]) -> None:
+    """Relabel clusters whose membership drifted, so the dashboard reads cached labels."""
+    clusters = group_by_cluster(load_session_memory())
+    if clusters:
+        label_clusters(clusters)
+
+
+def rebuild_alignment(job: Dict[str, Any]) -> None:
+    """Backfill missing scores and rebuild the running RCA aggregate."""
+    calculate_alignment_score(load_session_memory())
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "entry": process_entry,
+    "labels": refresh_labels,
+    "alignment": rebuild_alignment,
+}
@@ -0,0 +1,196 @@
+# core/memory/keyword_index.py
+
+import bisect
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.memory.user_storage import ensure_parent_dir, user_file
+from utils.metrics import timed
+
+KEYWORD_INDEX_FILE = os.path.join(os.path.dirname(__file__), "keyword_index.json")
+FIELDS = ("thought", "response", "tag")
+SAVE_EVERY = 25  # Newly indexed entries between snapshots
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_lock = threading.Lock()
+_indexes: Dict[str, Dict[str, Any]] = {}  # Index file path (one per user) -> loaded index
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lowercased word tokens ('#Insight loop' -> {'insight', 'loop'})."""
+    return set(_TOKEN_RE.findall(str(text or "").lower()))
+
+
+def _empty_index() -> Dict[str, Any]:
+    return {
+        "postings": {field: {} for field in FIELDS},  # field -> token -> set(ids)
+        "vocab": {field: [] for field in FIELDS},     # field -> sorted tokens, for prefix lookups
+        "indexed": set(),
+        "unsaved": 0,
+    }
+
+
+def _load() -> Dict[str, Any]:
+    """Load the current user's persisted snapshot once per process."""
+    path = user_file(KEYWORD_INDEX_FILE)
+    if path in _indexes:
+        return _indexes[path]
+
+    index = _empty_index()
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            for field in FIELDS:
+                postings = snapshot["postings"].get(field, {})
+                index["postings"][field] = {token: set(ids) for token, ids in postings.items()}
+                index["vocab"][field] = sorted(postings)
+            index["indexed"] = set(snapshot["indexed"])
+        except (json.JSONDecodeError, KeyError, OSError):
+            index = _empty_index()  # Rebuilt from the journal on the next sync
+    index["path"] = path
+    _indexes[path] = index
+    return index
+
+
+def _save(index: Dict[str, Any]) -> None:
+    snapshot = {
+        "postings": {
+            field: {token: sorted(ids, key=str) for token, ids in postings.items()}
+            for field, postings in index["postings"].items()
+        },
+        "indexed": sorted(index["indexed"], key=str),
+    }
+    tmp_path = ensure_parent_dir(index["path"]) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, index["path"])
+    index["unsaved"] = 0
+
+
+def _add(index: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    entry_id = entry["id"]
+    for field in FIELDS:
+        postings, vocab = index["postings"][field], index["vocab"][field]
+        for token in tokenize(entry.get(field, "")):
+            if token not in postings:
+                postings[token] = set()
+                bisect.insort(vocab, token)
+            postings[token].add(entry_id)
+    index["indexed"].add(entry_id)
+    index["unsaved"] += 1
+
+
+def _remove(index: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    entry_id = entry["id"]
+    for field in FIELDS:
+        postings, vocab = index["postings"][field], index["vocab"][field]
+        for token in tokenize(entry.get(field, "")):
+            ids = postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(entry_id)
+            if not ids:
+                del postings[token]
+                del vocab[bisect.bisect_left(vocab, token)]
+    index["indexed"].discard(entry_id)
+
+
+def reindex_entries(changes: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+    """
+    Replace the postings of edited entries, given (old, new) versions of each.
+    Called by the journal on every text edit; entries not indexed yet are skipped.
+    """
+    with _lock:
+        index = _load()
+        changed = False
+        for old, new in changes:
+            if old.get("id") not in index["indexed"]:
+                continue
+            _remove(index, old)
+            _add(index, new)
+            changed = True
+        if changed:
+            _save(index)  # Edits are rare; never leave a stale snapshot behind
+
+
+def reset_keyword_index() -> None:
+    """Drop the current user's index (after entries were removed); rebuilt on the next search."""
+    with _lock:
+        path = user_file(KEYWORD_INDEX_FILE)
+        _indexes.pop(path, None)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def update_keyword_index(entries: List[Dict[str, Any]], save: bool = False) -> None:
+    """
+    Index entries not seen before. Journal ids only grow, so scanning stops
+    at the first already-indexed entry from the end, unless the index holds
+    fewer ids than `entries` (e.g. the worker indexed a new entry after a
+    restart dropped unsaved ones): then every entry is checked.
+    """
+    with _lock:
+        index = _load()
+        pending = []
+        for entry in reversed(entries):
+            if "id" not in entry:
+                continue
+            if entry["id"] in index["indexed"]:
+                break
+            pending.append(entry)
+        if len(index["indexed"]) + len(pending) < sum("id" in entry for entry in entries):
+            pending = [entry for entry in reversed(entries) if "id" in entry and entry["id"] not in index["indexed"]]
+        for entry in reversed(pending):
+            _add(index, entry)
+        if index["unsaved"] and (save or index["unsaved"] >= SAVE_EVERY):
+            _save(index)
+
+
+def _match_term(index: Dict[str, Any], term: str, fields: List[str]) -> Set[Any]:
+    """Ids whose fields contain a token starting with `term`."""
+    matched: Set[Any] = set()
+    for field in fields:
+        vocab, postings = index["vocab"][field], index["postings"][field]
+        i = bisect.bisect_left(vocab, term)
+        while i < len(vocab) and vocab[i].startswith(term):
+            matched |= postings[vocab[i]]
+            i += 1
+    return matched
+
+
+def search_ids(query: str, field: Optional[str] = None) -> Set[Any]:
+    """AND of prefix matches for every query term, within one field or all fields."""
+    terms = _TOKEN_RE.findall(query.lower())
+    if not terms:
+        return set()
+    fields = [field] if field else list(FIELDS)
+    with _lock:
+        index = _load()
+        result: Optional[Set[Any]] = None
+        for term in terms:
+            matched = _match_term(index, term, fields)
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+    return result
+
+
+@timed("search.keyword")
+def keyword_search(query: str, memory: List[Dict[str, Any]], field: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Entries matching `query` (in journal order), keeping the index current first."""
+    update_keyword_index(memory)
+    ids = search_ids(query, field)
+    if not ids:
+        return []
+    # Journal ids normally equal list positions; fall back to a scan otherwise
+    positions = sorted(i for i in ids if isinstance(i, int) and 0 <= i < len(memory))
+    if len(positions) == len(ids) and all(memory[i].get("id") == i for i in positions):
+        return [memory[i] for i in positions]
+    return [entry for entry in memory if entry.get("id") in ids]
@@ -1,11 +1,17 @@
 # core/memory/memory_engine.py
 
+import json
+import os
 import numpy as np
-from typing import List, Dict
-from openai import OpenAI
+from typing import List, Dict, Any, Optional
+from core.memory.embedding_store import get_embeddings
+from core.memory.session_memory import get_session_entries, update_session_entries
+from core.memory.user_storage import ensure_parent_dir, shard_lock, user_file
+from gpt.client import get_client
+from utils.metrics import timed
+from utils.file_cache import load_json_cached
 
-# Initialize OpenAI client
-client = OpenAI()
+ALIGNMENT_STATS_FILE = os.path.join(os.path.dirname(__file__), "alignment_stats.json")
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """Calculate cosine similarity between two vectors."""
@@ -14,47 +20,202 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     vec1, vec2 = np.array(vec1), np.array(vec2)
     return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
 
-def calculate_entry_alignment(thought: str, response: str) -> float:
+def calculate_entry_alignment(thought: str, response: str) -> Optional[float]:
     """
     Calculate RCA alignment score between a single thought and response
-    using OpenAI text-embedding-3-small vectors.
+    using OpenAI text-embedding-3-small vectors (served from the embedding store).
+    Empty text scores 0.0; None means the embeddings are unavailable right now.
     """
+    if not thought.strip() or not response.strip():
+        return 0.0
+
     try:
-        if not thought.strip() or not response.strip():
-            return 0.0
+        thought_emb, response_emb = get_embeddings([thought, response], get_client())
+    except Exception:
+        return None
+    if thought_emb is None or response_emb is None:
+        return None
+
+    return round(float(alignment_scores(thought_emb[None, :], response_emb[None, :])[0]), 3)
+
+def score_entry(entry: Dict[str, Any]) -> float:
+    """
+    Compute and attach the RCA alignment score for a new entry.
+    Entries are immutable once saved, so the score is stored alongside them.
+    Raises RuntimeError (leaving the entry unscored) when embedding fails, so
+    a transient outage is retried instead of being stored as a 0.0 score.
+    """
+    score = calculate_entry_alignment(entry.get("thought", "").strip(), entry.get("response", "").strip())
+    if score is None:
+        raise RuntimeError("Embeddings unavailable; entry left unscored")
+    entry["alignment"] = score
+    return score
 
-        thought_emb = client.embeddings.create(
-            input=thought,
-            model="text-embedding-3-small"
-        ).data[0].embedding
+_FINGERPRINT_MASK = (1 << 64) - 1
 
-        response_emb = client.embeddings.create(
-            input=response,
-            model="text-embedding-3-small"
-        ).data[0].embedding
+def _entry_hashes(ids: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Well-mixed 64-bit hash per (id, score in thousandths) pair (splitmix64 finalizer)."""
+    with np.errstate(over="ignore"):
+        h = ids.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + scores.astype(np.uint64)
+        h ^= h >> np.uint64(30)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(27)
+        h *= np.uint64(0x94D049BB133111EB)
+        h ^= h >> np.uint64(31)
+    return h
 
-        return round(cosine_similarity(thought_emb, response_emb), 3)
+def _fingerprint_of(ids: List[int], scores: List[float]) -> int:
+    """Order-independent sum of entry hashes mod 2**64, so one new entry can be added in O(1)."""
+    if not ids:
+        return 0
+    hashes = _entry_hashes(np.asarray(ids, dtype=np.int64),
+                           np.rint(np.asarray(scores, dtype=np.float64) * 1000).astype(np.int64))
+    return int(hashes.sum(dtype=np.uint64))
 
-    except Exception:
+def alignment_fingerprint(memory: List[Dict[str, Any]]) -> int:
+    """
+    Fingerprint of the scored entries' (id, alignment) pairs. It changes when an
+    entry is edited, rescored, removed or replaced, even if the count stays the same.
+    """
+    scored = [entry for entry in memory if "alignment" in entry]
+    ids = [entry["id"] if isinstance(entry.get("id"), int) else -1 for entry in scored]
+    return _fingerprint_of(ids, [entry["alignment"] for entry in scored])
+
+def load_alignment_stats() -> Dict[str, Any]:
+    """Load the running RCA aggregate ({entries, count, total, fingerprint}) from disk."""
+    stats = load_json_cached(user_file(ALIGNMENT_STATS_FILE))
+    if isinstance(stats, dict):
+        return stats
+    return {"entries": 0, "count": 0, "total": 0.0, "fingerprint": 0}
+
+def alignment_stats_current(memory: List[Dict[str, Any]], stats: Dict[str, Any] = None) -> bool:
+    """Whether the stored aggregate covers exactly these entries and their current scores."""
+    stats = stats if stats is not None else load_alignment_stats()
+    return (stats["entries"] == len(memory)
+            and stats.get("fingerprint") == alignment_fingerprint(memory))
+
+def save_alignment_stats(stats: Dict[str, Any]) -> None:
+    """Atomically persist the current user's running RCA aggregate."""
+    path = ensure_parent_dir(user_file(ALIGNMENT_STATS_FILE))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+    os.replace(tmp_path, path)
+
+def update_alignment_stats(score: float, entry_id: int = None) -> Dict[str, Any]:
+    """Fold one new entry's score into the running mean (and fingerprint) in O(1)."""
+    with shard_lock(user_file(ALIGNMENT_STATS_FILE)):  # Read-modify-write per user
+        stats = load_alignment_stats()
+        stats["entries"] += 1
+        if score > 0:
+            stats["count"] += 1
+            stats["total"] += score
+        entry_hash = _fingerprint_of([entry_id if isinstance(entry_id, int) else -1], [score])
+        stats["fingerprint"] = (stats.get("fingerprint", 0) + entry_hash) & _FINGERPRINT_MASK
+        save_alignment_stats(stats)
+    return stats
+
+def _mean_score(stats: Dict[str, Any]) -> float:
+    if not stats["count"]:
         return 0.0
+    return round(stats["total"] / stats["count"], 3)
+
+def current_alignment_score() -> float:
+    """RCA mean from the running aggregate alone (never embeds; may lag in-flight entries)."""
+    return _mean_score(load_alignment_stats())
+
+def alignment_scores(thought_matrix: np.ndarray, response_matrix: np.ndarray) -> np.ndarray:
+    """
+    Row-wise cosine similarity between (N, D) thought and response embeddings.
+    Computed as one batched normalized dot product in float32; zero-norm rows score 0.
+    """
+    thoughts = np.asarray(thought_matrix, dtype=np.float32)
+    responses = np.asarray(response_matrix, dtype=np.float32)
+    if thoughts.size == 0:
+        return np.zeros(len(thoughts), dtype=np.float32)
+
+    dots = np.einsum("ij,ij->i", thoughts, responses)
+    norms = np.linalg.norm(thoughts, axis=1) * np.linalg.norm(responses, axis=1)
+    scores = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+    return np.round(scores, 3).astype(np.float32)
+
+def _backfill_alignment(memory: List[Dict[str, Any]]) -> None:
+    """
+    Attach alignment scores to entries that have none, embedding all of
+    them in one batched pass and scoring them in one vectorized call.
+    Entries whose embeddings fail are left unscored so a later call retries.
+    New scores are written back to the journal.
+    """
+    unscored = [entry for entry in memory if "alignment" not in entry]
+    if not unscored:
+        return
+
+    pairs = [(entry.get("thought", "").strip(), entry.get("response", "").strip()) for entry in unscored]
+    to_embed = [i for i, (thought, response) in enumerate(pairs) if thought and response]
+
+    try:
+        vectors = get_embeddings([text for i in to_embed for text in pairs[i]], get_client()) if to_embed else []
+    except Exception:
+        vectors = [None] * (2 * len(to_embed))
+
+    embeddable = set(to_embed)
+    for i, entry in enumerate(unscored):
+        if i not in embeddable:
+            entry["alignment"] = 0.0
 
+    ready = [
+        (i, thought_emb, response_emb)
+        for i, thought_emb, response_emb in zip(to_embed, vectors[0::2], vectors[1::2])
+        if thought_emb is not None and response_emb is not None
+    ]
+    if ready:
+        scores = alignment_scores(np.vstack([t for _, t, _ in ready]), np.vstack([r for _, _, r in ready]))
+        for (i, _, _), score in zip(ready, scores):
+            unscored[i]["alignment"] = round(float(score), 3)
+
+    # Persist so later loads (and the analytics frame) see the scores, but only
+    # for entries that really are this journal's (not synthetic or foreign lists)
+    candidates = [entry for entry in unscored if "alignment" in entry and "id" in entry]
+    stored = get_session_entries([entry["id"] for entry in candidates]) if candidates else {}
+    update_session_entries([
+        (entry["id"], {"alignment": entry["alignment"]})
+        for entry in candidates
+        if entry["id"] in stored and _same_text(entry, stored[entry["id"]])
+    ])
+
+def _same_text(entry: Dict[str, Any], stored: Dict[str, Any]) -> bool:
+    return entry.get("thought") == stored.get("thought") and entry.get("response") == stored.get("response")
+
+def entry_alignment_scores(memory: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Per-entry RCA scores as a float32 array aligned with `memory`.
+    Stored scores are reused; missing ones are backfilled first.
+    """
+    _backfill_alignment(memory)
+    return np.fromiter((entry.get("alignment", 0.0) for entry in memory), dtype=np.float32, count=len(memory))
+
+@timed("alignment.score")
 def calculate_alignment_score(memory: List[Dict[str, str]]) -> float:
     """
     Calculate average RCA alignment score for all memory entries.
     Ignores empty or malformed entries.
+
+    Served from the running aggregate when its fingerprint matches the entries'
+    (id, score) pairs. Otherwise the aggregate is rebuilt from the per-entry
+    scores, embedding (in one batched pass) only entries with no stored score yet.
     """
     if not memory:
         return 0.0
 
-    scores = []
-    for entry in memory:
-        thought = entry.get("thought", "").strip()
-        response = entry.get("response", "").strip()
-        score = calculate_entry_alignment(thought, response)
-        if score > 0:
-            scores.append(score)
+    stats = load_alignment_stats()
+    if alignment_stats_current(memory, stats):
+        return _mean_score(stats)
 
-    if not scores:
-        return 0.0
+    _backfill_alignment(memory)
 
-    return round(float(np.mean(scores)), 3)
+    scored = [entry["alignment"] for entry in memory if "alignment" in entry]
+    scores = [score for score in scored if score > 0]
+    stats = {"entries": len(scored), "count": len(scores), "total": float(sum(scores)),
+             "fingerprint": alignment_fingerprint(memory)}
+    save_alignment_stats(stats)
+    return _mean_score(stats)
@@ -1,22 +1,332 @@
 import os
 import json
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 
-MEMORY_FILE = os.path.join(os.path.dirname(__file__), "memory_store.json")
+from core.memory.keyword_index import FIELDS as INDEXED_FIELDS, reindex_entries, reset_keyword_index
+from core.memory.user_storage import shard_lock, user_file
+from utils.metrics import timed
 
+MEMORY_FILE = os.path.join(os.path.dirname(__file__), "memory_store.json")  # Legacy full-file store
+JOURNAL_FILE = os.path.join(os.path.dirname(__file__), "memory_store.jsonl")
+
+# Compact once update records outnumber this share of entries (and the floor)
+COMPACT_RATIO = 0.5
+COMPACT_MIN_UPDATES = 100
+
+# Process-wide replay of each user's journal, shared by that user's sessions.
+# A replay is kept in step with its file by (inode, size, mtime): appended bytes
+# are parsed incrementally, and only a replaced or rewritten file is replayed in full.
+_states: Dict[str, Dict[str, Any]] = {}
+_states_lock = threading.Lock()
+
+
+def _fsync_dir(path: str) -> None:
+    """Flush a directory entry so renames survive a crash (no-op where unsupported)."""
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _journal_path() -> str:
+    """The current user's journal (JOURNAL_FILE itself for the default user)."""
+    return user_file(JOURNAL_FILE)
+
+
+def _get_state(path: str) -> Dict[str, Any]:
+    with _states_lock:
+        state = _states.get(path)
+        if state is None:
+            state = _states[path] = {"path": path}
+            _reset_state(state)
+        return state
+
+
+def _reset_state(state: Dict[str, Any]) -> None:
+    state.update(ino=None, mtime=None, offset=0, entries=[], by_id={}, updates=0, next_id=0)
+
+
+def _apply_record(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Fold one journal record into the in-memory replay."""
+    if record.get("_op") == "update":
+        state["updates"] += 1
+        target = state["by_id"].get(record.get("id"))
+        if target is not None:
+            target.update(record.get("fields", {}))
+        return
+    state["entries"].append(record)
+    state["by_id"][record.get("id")] = record
+    if isinstance(record.get("id"), int):
+        state["next_id"] = max(state["next_id"], record["id"] + 1)
+
+
+def _sync(path: str) -> Dict[str, Any]:
+    """
+    Bring the replay of `path` up to date with the journal on disk.
+    Unchanged files cost one stat(); appends parse only the new bytes.
+    """
+    state = _get_state(path)
+    st = os.stat(path)
+    replaced = (
+        state["ino"] != st.st_ino
+        or st.st_size < state["offset"]
+        or (st.st_size == state["offset"] and st.st_mtime_ns != state["mtime"])
+    )
+    if replaced:
+        _reset_state(state)
+    elif st.st_size == state["offset"]:
+        return state
+
+    with open(path, "rb") as f:
+        f.seek(state["offset"])
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # A write still in flight; pick it up on the next sync
+            state["offset"] += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial write from a crash; the rest of the journal is intact
+            _apply_record(state, record)
+
+    state.update(ino=st.st_ino, mtime=st.st_mtime_ns)
+    return state
+
+
+def _write_journal(path: str, entries: List[Dict[str, Any]]) -> None:
+    """Atomically replace the journal with one record per entry."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def _append_records(path: str, records: List[Dict[str, Any]]) -> None:
+    """Append records to the journal and fsync before returning."""
+    state = _sync(path)
+    with open(path, "a+b") as f:
+        prefix = b""
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                prefix = b"\n"  # Seal off a torn tail so the new record parses
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        f.write(prefix + payload.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        st = os.fstat(f.fileno())
+    if state["offset"] + len(prefix) + len(payload.encode("utf-8")) != st.st_size:
+        return  # Someone else wrote too; the next sync replays from disk
+    for record in records:
+        _apply_record(state, json.loads(json.dumps(record)))
+    state.update(offset=st.st_size, mtime=st.st_mtime_ns)
+
+
+def _ensure_journal(path: str) -> None:
+    """Create the journal, importing the user's legacy memory_store.json exactly once."""
+    if os.path.exists(path):
+        return
+    legacy: List[Dict[str, Any]] = []
+    legacy_file = user_file(MEMORY_FILE)
+    if os.path.exists(legacy_file):
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except json.JSONDecodeError:
+            legacy = []
+    for i, entry in enumerate(legacy):
+        entry.setdefault("id", i)
+    _write_journal(path, legacy)
+
+
+def _has_journal(path: str) -> bool:
+    """Whether the user has anything stored yet; reads for a new user touch nothing on disk."""
+    state = _states.get(path)
+    if state is not None and state["ino"] is not None:
+        return True  # Already replayed; _sync() stats the file anyway
+    return os.path.exists(path) or os.path.exists(user_file(MEMORY_FILE))
+
+
+@timed("storage.load")
 def load_session_memory() -> List[Dict[str, Any]]:
-    """Load the session memory from disk."""
-    if not os.path.exists(MEMORY_FILE):
+    """Load the session memory from disk (served from the shared replay when unchanged)."""
+    path = _journal_path()
+    if not _has_journal(path):
         return []
-    
-    try:
-        with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+    with shard_lock(path):
+        _ensure_journal(path)
+        return [dict(entry) for entry in _sync(path)["entries"]]
+
+
+def count_session_entries() -> int:
+    """Number of entries in the journal (no copy of the data)."""
+    path = _journal_path()
+    if not _has_journal(path):
+        return 0
+    with shard_lock(path):
+        _ensure_journal(path)
+        return len(_sync(path)["entries"])
+
+
+def get_session_entry(entry_id: Any) -> Optional[Dict[str, Any]]:
+    """A copy of one entry by id (None if unknown), without copying the journal."""
+    path = _journal_path()
+    if not _has_journal(path):
+        return None
+    with shard_lock(path):
+        _ensure_journal(path)
+        entry = _sync(path)["by_id"].get(entry_id)
+        return dict(entry) if entry is not None else None
+
+
+def get_session_entries(entry_ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+    """Copies of the requested entries keyed by id; unknown ids are left out."""
+    path = _journal_path()
+    if not _has_journal(path):
+        return {}
+    with shard_lock(path):
+        _ensure_journal(path)
+        by_id = _sync(path)["by_id"]
+        return {entry_id: dict(by_id[entry_id]) for entry_id in entry_ids if entry_id in by_id}
+
+
+@timed("storage.page")
+def load_session_page(offset: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Reverse-chronological cursor: the `limit` entries after skipping the
+    newest `offset`, newest first. Only the requested page is copied.
+    """
+    path = _journal_path()
+    if not _has_journal(path):
         return []
+    with shard_lock(path):
+        _ensure_journal(path)
+        entries = _sync(path)["entries"]
+        end = max(len(entries) - offset, 0)
+        return [dict(entry) for entry in reversed(entries[max(end - limit, 0):end])]
+
+
+def append_session_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Append a single entry to the journal in O(1) and assign it an id.
+    Returns the stored entry.
+    """
+    return append_session_entries([entry])[0]
+
+
+@timed("storage.append")
+def append_session_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Append many entries with a single write and fsync, assigning sequential ids."""
+    if not entries:
+        return entries
+    path = _journal_path()
+    with shard_lock(path):
+        _ensure_journal(path)
+        next_id = _sync(path)["next_id"]
+        for entry in entries:
+            if "id" not in entry:
+                entry["id"] = next_id
+                next_id += 1
+        _append_records(path, entries)
+    return entries
 
+
+def update_session_entry(entry_id: Any, fields: Dict[str, Any]) -> None:
+    """Record new field values for an existing entry without rewriting the journal."""
+    update_session_entries([(entry_id, fields)])
+
+
+@timed("storage.update")
+def update_session_entries(changes: List[Tuple[Any, Dict[str, Any]]]) -> None:
+    """Record field updates for many entries with a single append and fsync."""
+    if not changes:
+        return
+    path = _journal_path()
+    with shard_lock(path):
+        _ensure_journal(path)
+        by_id = _sync(path)["by_id"]
+        edited = {entry_id: dict(by_id[entry_id]) for entry_id, fields in changes
+                  if entry_id in by_id and _touches_text(fields)}
+        _append_records(path, [{"_op": "update", "id": entry_id, "fields": fields} for entry_id, fields in changes])
+        if edited:
+            by_id = _sync(path)["by_id"]
+            reindex_entries([(old, by_id[entry_id]) for entry_id, old in edited.items() if entry_id in by_id])
+        _compact_if_needed(path)
+
+
+def _touches_text(fields: Dict[str, Any]) -> bool:
+    """Whether an update changes a keyword-indexed field (scores and clusters don't)."""
+    return any(field in fields for field in INDEXED_FIELDS)
+
+
+def _compact_if_needed(path: str) -> None:
+    """Rewrite the journal once update records outgrow the compaction threshold."""
+    state = _sync(path)
+    if state["updates"] >= max(COMPACT_MIN_UPDATES, len(state["entries"]) * COMPACT_RATIO):
+        compact_session_memory()
+
+
+@timed("storage.compact")
+def compact_session_memory() -> None:
+    """Fold update records into their entries and rewrite the journal."""
+    path = _journal_path()
+    with shard_lock(path):
+        _ensure_journal(path)
+        _write_journal(path, _sync(path)["entries"])
+
+
+@timed("storage.save")
 def save_session_memory(memory: List[Dict[str, Any]]) -> None:
-    """Save the session memory to disk."""
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=4, ensure_ascii=False)
+    """
+    Save the session memory to disk.
+    New trailing entries are appended and changed entries are recorded as
+    updates; the journal is only rewritten when entries were removed.
+    """
+    path = _journal_path()
+    with shard_lock(path):
+        _ensure_journal(path)
+        state = _sync(path)
+        stored = state["entries"]
+        if len(memory) < len(stored):
+            for i, entry in enumerate(memory):
+                entry.setdefault("id", i)
+            _write_journal(path, memory)
+            reset_keyword_index()  # Postings may name removed ids
+            return
+
+        records: List[Dict[str, Any]] = []
+        edited: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        for old, new in zip(stored, memory):
+            new.setdefault("id", old.get("id"))
+            changed = {key: value for key, value in new.items() if old.get(key) != value}
+            if changed:
+                records.append({"_op": "update", "id": old.get("id"), "fields": changed})
+                if _touches_text(changed):
+                    edited.append((dict(old), new))
+
+        next_id = state["next_id"]
+        for entry in memory[len(stored):]:
+            if "id" not in entry:
+                entry["id"] = next_id
+                next_id += 1
+            records.append(entry)
 
+        if records:
+            _append_records(path, records)
+            if edited:
+                reindex_entries(edited)
+            _compact_if_needed(path)
@@ -2,13 +2,10 @@
 
 import streamlit as st
 import json
-import os
 from pathlib import Path
 from core.memory.user_profile import save_user_profile
-import openai
+from gpt.client import get_client  # Shared, rate-limited client
 
-# --- API Setup
-openai.api_key = os.getenv("OPENAI_API_KEY")
 PROFILE_PATH = Path("database/user_profile.json")
 
 # --- Load Profile
@@ -50,7 +47,7 @@ if st.button("🔄 Regenerate Adaptive Mirror"):
         )
 
         try:
-            response = openai.ChatCompletion.create(
+            response = get_client().chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": (
@@ -65,7 +62,7 @@ if st.button("🔄 Regenerate Adaptive Mirror"):
                 max_tokens=1000
             )
 
-            updated_prompt = response.choices[0].message["content"]
+            updated_prompt = response.choices[0].message.content
 
             # --- Save to Profile
             save_user_profile(
@@ -0,0 +1,138 @@
+# core/memory/user_storage.py
+
+import contextlib
+import contextvars
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl  # POSIX advisory locks between server processes
+except ImportError:  # pragma: no cover - Windows falls back to in-process locking
+    fcntl = None
+
+# Root of the per-user shards: <USER_DATA_DIR>/<2-char bucket>/<readable prefix>-<id hash>/
+USER_DATA_DIR = os.getenv(
+    "MINDFORGE_USER_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "users"),
+)
+
+# The default (unauthenticated) user keeps the original single-user files, so
+# existing installs and anything that patches the module-level paths keep
+# working unchanged. It is the empty id: no real identity can map to it.
+DEFAULT_USER = ""
+
+_USER_ID_RE = re.compile(r"[^A-Za-z0-9_-]+")
+SHARD_PREFIX_LEN = 24  # Readable part of a shard name; the hash alone identifies the user
+
+_current_user: contextvars.ContextVar = contextvars.ContextVar("mindforge_user", default=DEFAULT_USER)
+
+_locks: Dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+_held = threading.local()  # shard -> re-entrancy depth of the file lock in this thread
+
+
+def normalize_user_id(user_id: Optional[str]) -> str:
+    """Canonical user id: the identity as given, minus surrounding whitespace ('' / None -> the default user)."""
+    return str(user_id or "").strip()
+
+
+def get_current_user() -> str:
+    return _current_user.get()
+
+
+def set_current_user(user_id: Optional[str]) -> str:
+    """Bind storage calls in this context (one Streamlit session / thread) to `user_id`."""
+    user_id = normalize_user_id(user_id)
+    _current_user.set(user_id)
+    return user_id
+
+
+@contextlib.contextmanager
+def user_context(user_id: Optional[str]) -> Iterator[str]:
+    """Temporarily route storage calls to another user's shard."""
+    token = _current_user.set(normalize_user_id(user_id))
+    try:
+        yield _current_user.get()
+    finally:
+        _current_user.reset(token)
+
+
+def _resolve(user_id: Optional[str]) -> str:
+    return normalize_user_id(get_current_user() if user_id is None else user_id)
+
+
+def shard_dir(user_id: Optional[str] = None) -> str:
+    """
+    Directory holding one user's files. It is named after a hash of the exact
+    id (with a sanitized prefix for humans), so distinct ids never share a
+    shard, and bucketed by that hash to keep directories small.
+    """
+    user_id = _resolve(user_id)
+    digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+    prefix = _USER_ID_RE.sub("_", user_id)[:SHARD_PREFIX_LEN].strip("_")
+    name = f"{prefix}-{digest[:32]}" if prefix else digest[:32]
+    return os.path.join(USER_DATA_DIR, digest[:2], name)  # Created by the first write, not by lookups
+
+
+def ensure_parent_dir(path) -> str:
+    """Create the directory a store file is about to be written into (its shard on first write)."""
+    os.makedirs(os.path.dirname(os.path.abspath(str(path))), exist_ok=True)
+    return str(path)
+
+
+def user_file(default_path, user_id: Optional[str] = None) -> str:
+    """
+    Per-user location of a store file: `default_path` itself for the default
+    user, otherwise a file with the same name inside the user's shard.
+    """
+    user_id = _resolve(user_id)
+    if user_id == DEFAULT_USER:
+        return str(default_path)
+    return os.path.join(shard_dir(user_id), os.path.basename(str(default_path)))
+
+
+def _thread_lock(key: str) -> threading.RLock:
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.RLock()
+        return lock
+
+
+@contextlib.contextmanager
+def shard_lock(path) -> Iterator[None]:
+    """
+    Exclusive, re-entrant lock over the store files in `path`'s directory:
+    a thread lock within the process plus an flock on `.lock` across
+    processes. Different users' shards never contend with each other.
+    """
+    directory = os.path.dirname(os.path.abspath(str(path)))
+    lock = _thread_lock(directory)
+    with lock:
+        depth = getattr(_held, "depth", None)
+        if depth is None:
+            depth = _held.depth = {}
+        if not depth.get(directory):
+            os.makedirs(directory, exist_ok=True)  # Locking is a write path: the shard may be new
+        if fcntl is None or depth.get(directory):
+            depth[directory] = depth.get(directory, 0) + 1
+            try:
+                yield
+            finally:
+                depth[directory] -= 1
+            return
+
+        fd = os.open(os.path.join(directory, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            depth[directory] = 1
+            try:
+                yield
+            finally:
+                depth[directory] = 0
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
@@ -1,7 +1,12 @@
 # core/memory/utils.py
 import json
+import os
 from pathlib import Path
 
+from core.memory.user_storage import shard_lock, user_file
+
+PROFILE_PATH = Path("database/user_profile.json")
+
 def save_user_profile(name, age, bio, current_struggles, past_struggles, answers, generated_prompt):
     profile_data = {
         "name": name,
@@ -12,6 +17,9 @@ def save_user_profile(name, age, bio, current_struggles, past_struggles, answers
         "answers": answers,
         "generated_prompt": generated_prompt
     }
-    path = Path("database/user_profile.json")
-    with path.open("w") as f:
-        json.dump(profile_data, f, indent=2)
+    path = user_file(PROFILE_PATH)  # The active user's profile shard
+    with shard_lock(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(profile_data, f, indent=2)
+        os.replace(tmp_path, path)
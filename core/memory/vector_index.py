@@ -0,0 +1,111 @@
+# core/memory/vector_index.py
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from core.memory.embedding_store import get_embedding, get_embeddings
+from core.memory.user_storage import get_current_user
+from gpt.client import get_client
+from utils.metrics import timed
+
+
+class VectorIndex:
+    """
+    Brute-force cosine index over a contiguous float32 matrix of unit rows.
+    Search is a single BLAS matrix-vector product plus argpartition; appends
+    are amortized O(D) thanks to capacity doubling.
+    """
+
+    def __init__(self, dim: int = 0):
+        self.dim = dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._ids: List[Any] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, ids: List[Any], vectors: np.ndarray) -> None:
+        """Append vectors (normalized on insert) under the given ids."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if not len(ids):
+            return
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+        with self._lock:
+            if not self.dim:
+                self.dim = vectors.shape[1]
+                self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            needed = len(self._ids) + len(ids)
+            if needed > self._matrix.shape[0]:
+                grown = np.zeros((max(needed, 2 * self._matrix.shape[0], 64), self.dim), dtype=np.float32)
+                grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+                self._matrix = grown
+            self._matrix[len(self._ids):needed] = vectors
+            self._ids.extend(ids)
+
+    def search(self, query: np.ndarray, k: int = 10) -> List[Tuple[Any, float]]:
+        """Return up to k (id, cosine score) pairs, most similar first."""
+        with self._lock:
+            count = len(self._ids)
+            if not count:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return []
+            scores = self._matrix[:count] @ (query / norm)
+            k = min(k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[i], float(scores[i])) for i in top]
+
+
+# --- Per-User Journal Indexes (process-wide, reused across reruns and sessions)
+
+_journal_indexes: Dict[str, Tuple[VectorIndex, set]] = {}  # user id -> (index, indexed ids)
+_index_lock = threading.Lock()
+
+
+def _journal_index() -> Tuple[VectorIndex, set]:
+    user_id = get_current_user()
+    if user_id not in _journal_indexes:
+        _journal_indexes[user_id] = (VectorIndex(), set())
+    return _journal_indexes[user_id]
+
+
+def index_entries(entries: List[Dict[str, Any]]) -> None:
+    """Add entries' cached thought embeddings to the current user's index (skips known ids)."""
+    with _index_lock:
+        index, indexed_ids = _journal_index()
+        pending = [e for e in entries if e.get("thought") and e.get("id") not in indexed_ids]
+        if not pending:
+            return
+        vectors = get_embeddings([e["thought"] for e in pending], get_client())
+        ready = [(e["id"], v) for e, v in zip(pending, vectors) if v is not None]
+        if ready:
+            index.add([entry_id for entry_id, _ in ready], np.vstack([v for _, v in ready]))
+            indexed_ids.update(entry_id for entry_id, _ in ready)
+
+
+def index_entry(entry: Dict[str, Any]) -> None:
+    """Incrementally index one newly appended entry."""
+    index_entries([entry])
+
+
+@timed("search.semantic")
+def semantic_search(query: str, memory: List[Dict[str, Any]], k: int = 10) -> List[Dict[str, Any]]:
+    """Top-k journal entries whose thoughts are semantically closest to `query`."""
+    if not query.strip():
+        return []
+    index_entries(memory)
+    query_vector = get_embedding(query.strip(), get_client())
+    if query_vector is None:
+        return []
+    with _index_lock:
+        index, _ = _journal_index()
+    by_id = {entry.get("id"): entry for entry in memory}
+    return [by_id[entry_id] for entry_id, _ in index.search(query_vector, k) if entry_id in by_id]
@@ -1,14 +1,22 @@
 import streamlit as st
-import pandas as pd
 import json
-import matplotlib.pyplot as plt
-from core.memory.session_memory import load_session_memory
-from core.memory.memory_engine import calculate_alignment_score
-from core.memory.cluster_engine import cluster_thoughts, generate_cluster_label
+from core.memory.session_memory import load_session_memory, load_session_page, count_session_entries
+from core.memory.memory_engine import alignment_stats_current, current_alignment_score
+from core.memory.analytics import get_analytics_frame, daily_alignment
+from core.memory.cluster_engine import cached_cluster_labels, cluster_thoughts
+from core.memory.job_queue import enqueue_job, pending_entry_ids, start_workers
+from core.memory.vector_index import semantic_search
+from core.memory.keyword_index import keyword_search
+from utils.timeline import render_timeline, list_page_fetcher
+from utils.trend_chart import trend_chart_png
+from utils.session_user import activate_session_user
+from utils.metrics import METRICS_ENABLED, summary, summarize_file
 
 st.set_page_config(page_title="IN Dashboard", layout="wide")
 st.title("📊 Introspect Nexus Dashboard")
 st.subheader("Recursive Cognitive Alignment Overview")
+activate_session_user()  # Every read and write below goes to this user's shard
+start_workers()  # Label and backfill jobs enqueued below run here (started once per process)
 
 # Load session memory
 memory = load_session_memory()
@@ -21,80 +29,112 @@ with st.sidebar:
     st.header("🧠 Session Summary")
     st.markdown(f"**Total Reflections:** {len(memory)}")
 
-    try:
-        score = calculate_alignment_score(memory)
-        st.metric("🧬 RCA Score", f"{score:.2f} / 1.0")
-    except Exception as e:
-        st.error(f"RCA score error: {e}")
-        score = 0.0
+    pending = pending_entry_ids()
+    if not pending and not alignment_stats_current(memory):
+        enqueue_job("alignment", dedupe=True)  # Backfill older entries off the request path
+    score = current_alignment_score()  # Precomputed running mean; never embeds here
+    st.metric("🧬 RCA Score", f"{score:.2f} / 1.0")
+    if pending:
+        st.caption(f"⏳ {len(pending)} reflection(s) still being scored…")
 
     st.markdown("---")
     st.subheader("🔍 Search & Filter")
     search_term = st.text_input("Search by keyword or tag")
     filter_type = st.radio("Filter in:", ["All", "Thoughts", "Responses", "Tags"], horizontal=True)
 
-    def entry_matches(entry):
-        term = search_term.lower()
-        if filter_type == "All":
-            return term in entry.get("thought", "").lower() or \
-                   term in entry.get("response", "").lower() or \
-                   term in entry.get("tag", "").lower()
-        return term in entry.get(filter_type.lower(), "").lower()
+    filter_fields = {"All": None, "Thoughts": "thought", "Responses": "response", "Tags": "tag"}
+
+    semantic = st.checkbox("🔮 Semantic search (find related reflections)")
 
-    filtered_memory = [entry for entry in memory if entry_matches(entry)] if search_term else memory
+    if search_term and semantic:
+        # Top matches by meaning, shown in timeline order
+        matches = semantic_search(search_term, memory, k=30)
+        filtered_memory = sorted(matches, key=lambda entry: entry.get("id", 0))
+    else:
+        # Inverted index: every word must match (as a prefix) within the chosen field
+        filtered_memory = keyword_search(search_term, memory, filter_fields[filter_type]) if search_term else memory
 
     st.markdown("---")
     st.subheader("📤 Export Data")
-    export_format = st.selectbox("Choose format", ["JSON", "CSV"])
-    if st.button("Download"):
-        if export_format == "JSON":
+    export_format = st.selectbox("Choose format", ["Parquet", "Arrow", "JSON", "CSV"])
+    if st.button("Download"):  # Export is only built once requested
+        if export_format in ("Parquet", "Arrow"):
+            from core.memory.archive import export_archive  # pyarrow loads on first export
+        if export_format == "Parquet":
+            st.download_button("Download Parquet", data=export_archive(filtered_memory, fmt="parquet"),
+                               file_name="memory_export.parquet", mime="application/vnd.apache.parquet")
+        elif export_format == "Arrow":
+            st.download_button("Download Arrow", data=export_archive(filtered_memory, fmt="arrow"),
+                               file_name="memory_export.arrow", mime="application/vnd.apache.arrow.file")
+        elif export_format == "JSON":
             st.download_button("Download JSON", data=json.dumps(filtered_memory, indent=2),
                                file_name="memory_export.json", mime="application/json")
         else:
+            import pandas as pd
             df_export = pd.DataFrame(filtered_memory)
             st.download_button("Download CSV", data=df_export.to_csv(index=False),
                                file_name="memory_export.csv", mime="text/csv")
 
+    st.subheader("📥 Import Archive")
+    uploaded = st.file_uploader("Parquet or Arrow export", type=["parquet", "arrow"])
+    if uploaded is not None and st.button("Import into journal"):
+        try:
+            from core.memory.archive import import_archive
+            imported = import_archive(uploaded.getvalue())
+            st.success(f"✅ Imported {imported} reflections.")
+        except Exception as e:
+            st.error(f"❌ Import failed: {e}")
+
 # RCA Trend Over Time
 st.markdown("---")
 st.subheader("📈 RCA Trend Over Time")
-df = pd.DataFrame(memory)
+frame = get_analytics_frame(memory)  # Cached; only new entries are converted
 
-if not df.empty and "timestamp" in df.columns:
+if not frame.empty and frame["timestamp"].notna().any():
     try:
-        df["date"] = pd.to_datetime(df["timestamp"]).dt.date
-        df["thought_len"] = df["thought"].apply(lambda x: len(str(x)))
-        df["response_len"] = df["response"].apply(lambda x: len(str(x)))
-        df["alignment"] = 1.0 - (
-            abs(df["thought_len"] - df["response_len"]) /
-            df[["thought_len", "response_len"]].max(axis=1).replace(0, 1)
-        )
-        df["alignment"] = df["alignment"].clip(0.0, 1.0).round(3)
-        trend_df = df.groupby("date")["alignment"].mean().reset_index()
-
-        fig, ax = plt.subplots()
-        ax.plot(trend_df["date"], trend_df["alignment"], marker='o', linestyle='-')
-        ax.set_title("Daily RCA Alignment Score")
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Avg RCA Score")
-        ax.grid(True)
-        st.pyplot(fig)
+        trend_df = daily_alignment(memory)  # Precomputed daily aggregates
+        st.image(trend_chart_png(trend_df))  # Re-rendered only when the aggregates change
     except Exception as e:
         st.warning(f"⚠️ RCA graph error: {e}")
 else:
     st.info("Not enough data to plot RCA trend.")
 
+# Thought Clusters
+st.markdown("---")
+st.subheader("🧩 Thought Clusters")
+if st.checkbox("Show semantic clusters"):
+    try:
+        clusters = cluster_thoughts(memory)
+        labels = cached_cluster_labels(clusters)  # Never calls GPT on a rerun
+        if any(entries and cluster_id not in labels for cluster_id, entries in clusters.items()):
+            enqueue_job("labels", dedupe=True)  # Drifted or new clusters are relabeled by a worker
+        for cluster_id, entries in clusters.items():
+            if not entries:
+                continue
+            with st.expander(f"{labels.get(cluster_id, 'Unlabeled')} — {len(entries)} reflections"):
+                for entry in reversed(entries[-5:]):
+                    st.markdown(f"- {entry['thought']}")
+    except Exception as e:
+        st.warning(f"⚠️ Clustering error: {e}")
+
 # Thought Timeline
 st.markdown("---")
 st.subheader("🧠 Thought Timeline")
 if filtered_memory:
-    for entry in reversed(filtered_memory[-30:]):
-        st.markdown(f"**{entry['timestamp']}**")
-        if entry.get("tag"):
-            st.markdown(f"🏷️ *{entry['tag']}*")
-        st.code(f"🗯️ {entry['thought']}")
-        st.success(f"🔁 {entry['response']}")
-        st.markdown("---")
+    if filtered_memory is memory:
+        # Unfiltered: page straight off the journal's reverse-chronological cursor
+        render_timeline(load_session_page, count_session_entries(), key="dashboard", page_size=30)
+    else:
+        render_timeline(list_page_fetcher(filtered_memory), len(filtered_memory), key="dashboard", page_size=30)
 else:
     st.warning("No entries matched the current filter.")
 
+# Performance (only when span metrics are enabled)
+if METRICS_ENABLED:
+    st.markdown("---")
+    st.subheader("⏱️ Performance")
+    rows = summary() or summarize_file()  # This process's spans, else the shared JSONL export
+    if rows:
+        st.dataframe(rows, use_container_width=True)
+    else:
+        st.info("No spans recorded yet.")
@@ -0,0 +1,471 @@
+# gpt/client.py
+
+import asyncio
+import contextlib
+import contextvars
+import email.utils
+import os
+import random
+import threading
+import time
+import weakref
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from utils.metrics import span
+
+load_dotenv()
+
+# --- Tunables (override via environment)
+REQUEST_TIMEOUT = float(os.getenv("MINDFORGE_OPENAI_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("MINDFORGE_OPENAI_MAX_RETRIES", "3"))
+MAX_CONCURRENCY = int(os.getenv("MINDFORGE_OPENAI_MAX_CONCURRENCY", "8"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+# Per-endpoint budgets: requests and tokens per minute (match the account's rate limits)
+RATE_LIMITS = {
+    "chat": {
+        "rpm": float(os.getenv("MINDFORGE_CHAT_RPM", "500")),
+        "tpm": float(os.getenv("MINDFORGE_CHAT_TPM", "40000")),
+    },
+    "embeddings": {
+        "rpm": float(os.getenv("MINDFORGE_EMBEDDINGS_RPM", "3000")),
+        "tpm": float(os.getenv("MINDFORGE_EMBEDDINGS_TPM", "1000000")),
+    },
+}
+
+# --- Priority Lanes
+INTERACTIVE = 0  # A user is waiting on the result (chat replies, search queries)
+BACKGROUND = 1   # Job workers, refits and backfills
+BACKGROUND_RESERVE = 0.2  # Share of each bucket background calls may not drain
+MIN_RATE_SCALE = 0.1      # Floor for adaptive slow-down after 429s
+RATE_RECOVERY = 0.05      # Rate share regained per successful call
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("openai_priority", default=INTERACTIVE)
+
+_client = None
+_client_lock = threading.Lock()
+_sync_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+# Async clients and semaphores are bound to the event loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+_async_slots = weakref.WeakKeyDictionary()
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed API calls in the given lane (e.g. BACKGROUND for job workers)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+# --- Token Buckets
+
+class TokenBucket:
+    """Continuous-refill bucket holding up to `capacity` units, refilled at `rate` units/second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, scale: float = 1.0) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0, scale: float = 1.0) -> float:
+        """Seconds until `amount` can be taken while leaving `reserve` of capacity untouched."""
+        amount = min(amount, self.capacity * (1 - reserve))  # Oversized requests wait for a full bucket
+        missing = amount + self.capacity * reserve - self.level
+        return max(missing, 0.0) / (self.rate * scale)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class EndpointLimiter:
+    """
+    Request and token buckets for one endpoint, shared by every caller in the
+    process. Interactive callers go first: background callers wait while any
+    interactive caller is queued and never dip into BACKGROUND_RESERVE.
+    A 429 pauses the endpoint for its Retry-After and halves the refill rate,
+    which then recovers additively on success.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float):
+        self.name = name
+        self.requests = TokenBucket(rpm / 60.0, max(rpm, 1.0))
+        self.tokens = TokenBucket(tpm / 60.0, max(tpm, 1.0))
+        self.scale = 1.0
+        self.paused_until = 0.0
+        self.waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int, priority: int = INTERACTIVE) -> float:
+        """Take one request and `tokens` tokens if possible; else return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if priority != INTERACTIVE and self.waiting[INTERACTIVE]:
+                return 0.05
+            self.requests.refill(now, self.scale)
+            self.tokens.refill(now, self.scale)
+            reserve = BACKGROUND_RESERVE if priority != INTERACTIVE else 0.0
+            wait = max(self.requests.wait_time(1, reserve, self.scale),
+                       self.tokens.wait_time(tokens, reserve, self.scale))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            return 0.0
+
+    @contextlib.contextmanager
+    def _queued(self, priority: int) -> Iterator[None]:
+        with self._lock:
+            self.waiting[priority] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.waiting[priority] -= 1
+
+    def acquire(self, tokens: int, priority: int = INTERACTIVE) -> None:
+        with self._queued(priority):
+            while True:
+                wait = self.try_acquire(tokens, priority)
+                if wait <= 0:
+                    return
+                time.sleep(min(wait, 0.25))
+
+    async def acquire_async(self, tokens: int, priority: int = INTERACTIVE) -> None:
+        with self._queued(priority):
+            while True:
+                wait = self.try_acquire(tokens, priority)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(min(wait, 0.25))
+
+    def penalize(self, retry_after: Optional[float]) -> None:
+        """React to a 429: pause for Retry-After (or a backoff) and slow the refill rate."""
+        with self._lock:
+            pause = retry_after if retry_after is not None else backoff_delay(0)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.scale = max(MIN_RATE_SCALE, self.scale * 0.5)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.scale = min(1.0, self.scale + RATE_RECOVERY)
+
+
+_limiters: Dict[str, EndpointLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(endpoint: str) -> EndpointLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(endpoint)
+        if limiter is None:
+            limits = RATE_LIMITS.get(endpoint, RATE_LIMITS["chat"])
+            limiter = _limiters[endpoint] = EndpointLimiter(endpoint, limits["rpm"], limits["tpm"])
+        return limiter
+
+
+def estimate_request_tokens(kwargs: Dict[str, Any]) -> int:
+    """Rough token cost of a chat or embeddings request (~4 characters per token)."""
+    if "messages" in kwargs:
+        chars = sum(len(str(message.get("content", ""))) for message in kwargs["messages"])
+        return chars // 4 + int(kwargs.get("max_tokens") or 256)
+    inputs = kwargs.get("input", "")
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    return sum(len(str(text)) // 4 + 1 for text in inputs)
+
+# --- Shared Clients
+
+class _LimitedResource:
+    """An SDK resource (e.g. client.embeddings) whose create() is rate-limited and retried."""
+
+    def __init__(self, resource, limiter: EndpointLimiter):
+        self._resource = resource
+        self._limiter = limiter
+
+    def create(self, **kwargs):
+        return call_with_retries(self._resource.create, limiter=self._limiter, **kwargs)
+
+
+class _AsyncLimitedResource(_LimitedResource):
+    async def create(self, **kwargs):
+        return await acall_with_retries(self._resource.create, limiter=self._limiter, **kwargs)
+
+
+class RateLimitedClient:
+    """
+    Drop-in facade over an OpenAI client exposing chat.completions.create and
+    embeddings.create through the shared limiters. `raw` is the wrapped client.
+    """
+
+    def __init__(self, client, is_async: bool = False):
+        resource = _AsyncLimitedResource if is_async else _LimitedResource
+        self.raw = client
+        self.chat = SimpleNamespace(completions=resource(client.chat.completions, get_limiter("chat")))
+        self.embeddings = resource(client.embeddings, get_limiter("embeddings"))
+
+
+def get_client():
+    """
+    Return the process-wide rate-limited client (one keep-alive connection pool),
+    created on first use so importing this module stays cheap.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                # Retries are handled here with jitter, not inside the SDK
+                _client = RateLimitedClient(OpenAI(timeout=REQUEST_TIMEOUT, max_retries=0))
+    return _client
+
+
+def get_async_client():
+    """Return the rate-limited AsyncOpenAI client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = RateLimitedClient(AsyncOpenAI(timeout=REQUEST_TIMEOUT, max_retries=0), is_async=True)
+        _async_clients[loop] = client
+    return client
+
+# --- Retry Policy
+
+def is_retryable(exc: Exception) -> bool:
+    """Transient failures: timeouts, dropped connections, 429s and 5xx responses."""
+    import openai
+
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status in RETRYABLE_STATUS or (status is not None and status >= 500)
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Server-requested delay from retry-after-ms / Retry-After (seconds or HTTP date)."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return max(float(headers["retry-after-ms"]) / 1000.0, 0.0)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _after_failure(exc: Exception, attempt: int, limiter: Optional[EndpointLimiter]) -> float:
+    """Delay before the next attempt; a 429 also throttles the endpoint for every caller."""
+    retry_after = retry_after_seconds(exc)
+    if limiter is not None and getattr(exc, "status_code", None) == 429:
+        limiter.penalize(retry_after)
+    return min(retry_after, BACKOFF_CAP) if retry_after is not None else backoff_delay(attempt)
+
+
+def _span_name(limiter: Optional[EndpointLimiter]) -> str:
+    return f"openai.{limiter.name}" if limiter is not None else "openai.call"
+
+
+def usage_tokens(result: Any, estimate: int = 0) -> int:
+    """Tokens billed for a response (its `usage`), else the pre-call estimate (e.g. streams)."""
+    usage = getattr(result, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else estimate
+
+
+class _SlotHeldStream:
+    """
+    A streaming response that keeps its concurrency slot while chunks are
+    still arriving: the slot is released once the stream is exhausted,
+    fails, is closed, or is garbage-collected unfinished.
+    """
+
+    def __init__(self, stream, release: Callable[[], None]):
+        self._release: Optional[Callable[[], None]] = None  # Set last: a failed init releases nothing
+        self._stream = stream
+        self._chunks = iter(stream)
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        release, self._release = self._release, None
+        if release is None:
+            return
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _AsyncSlotHeldStream:
+    """Async counterpart of _SlotHeldStream for AsyncStream responses."""
+
+    def __init__(self, stream, release: Callable[[], None]):
+        self._release: Optional[Callable[[], None]] = None
+        self._stream = stream
+        self._chunks = stream.__aiter__()
+        self._release = release
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._chunks.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    def close(self) -> None:
+        # Synchronous path (garbage collection): free the slot; the SDK closes its response
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    async def aclose(self) -> None:
+        release, self._release = self._release, None
+        if release is None:
+            return
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                await close()
+        finally:
+            release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    def __del__(self):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def call_with_retries(fn, *args, limiter: Optional[EndpointLimiter] = None, **kwargs):
+    """
+    Run a blocking API call under the concurrency limiter (and, if given, the
+    endpoint's rate limiter in the caller's priority lane), retrying transient
+    failures with jittered backoff or the server's Retry-After. A streaming
+    call (stream=True) holds its slot until the returned stream is consumed.
+    """
+    priority = current_priority()
+    cost = estimate_request_tokens(kwargs) if limiter is not None else 0
+    with span(_span_name(limiter)) as s:
+        for attempt in range(MAX_RETRIES + 1):
+            if limiter is not None:
+                limiter.acquire(cost, priority)
+            _sync_slots.acquire()
+            held = False
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                s.set(retries=attempt)
+                if attempt >= MAX_RETRIES or not is_retryable(e):
+                    raise
+                delay = _after_failure(e, attempt, limiter)
+            else:
+                if limiter is not None:
+                    limiter.record_success()
+                s.set(retries=attempt, tokens=usage_tokens(result, cost))
+                if kwargs.get("stream"):
+                    result = _SlotHeldStream(result, _sync_slots.release)
+                    held = True
+                return result
+            finally:
+                if not held:
+                    _sync_slots.release()
+            time.sleep(delay)
+
+
+async def acall_with_retries(fn, *args, limiter: Optional[EndpointLimiter] = None, **kwargs):
+    """Async counterpart of call_with_retries for coroutine functions."""
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(MAX_CONCURRENCY)
+        _async_slots[loop] = slots
+
+    priority = current_priority()
+    cost = estimate_request_tokens(kwargs) if limiter is not None else 0
+    with span(_span_name(limiter)) as s:
+        for attempt in range(MAX_RETRIES + 1):
+            if limiter is not None:
+                await limiter.acquire_async(cost, priority)
+            await slots.acquire()
+            held = False
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                s.set(retries=attempt)
+                if attempt >= MAX_RETRIES or not is_retryable(e):
+                    raise
+                delay = _after_failure(e, attempt, limiter)
+            else:
+                if limiter is not None:
+                    limiter.record_success()
+                s.set(retries=attempt, tokens=usage_tokens(result, cost))
+                if kwargs.get("stream"):
+                    result = _AsyncSlotHeldStream(result, slots.release)
+                    held = True
+                return result
+            finally:
+                if not held:
+                    slots.release()
+            await asyncio.sleep(delay)
@@ -1,21 +1,23 @@
-import openai
+import asyncio
 import os
-import json
+import time
 from pathlib import Path
-from dotenv import load_dotenv
-
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from core.memory.embedding_store import get_embedding
+from core.memory.user_storage import DEFAULT_USER, get_current_user, user_file
+from gpt.client import get_client, get_async_client
+from gpt.response_cache import ResponseCache, cache_key, normalize_input
+from gpt.retrieval import build_context
+from utils.file_cache import load_json_cached
+from utils.metrics import span
 
 PROFILE_PATH = Path("database/user_profile.json")
 
 # --- Load User-Specific or Fallback Prompt
 
 def load_active_prompt():
-    if PROFILE_PATH.exists():
-        with open(PROFILE_PATH, "r") as f:
-            profile = json.load(f)
-            return profile.get("generated_prompt", default_prompt())
+    profile = load_json_cached(user_file(PROFILE_PATH))  # Re-parsed only when the file changes
+    if isinstance(profile, dict):
+        return profile.get("generated_prompt", default_prompt())
     return default_prompt()
 
 # --- Default System Prompt
@@ -28,20 +30,134 @@ def default_prompt():
 
 # --- Main GPT-4 Reflection Handler
 
-def handle_prompt(user_input):
+CHAT_MODEL = "gpt-4"
+TEMPERATURE = 0.7
+ERROR_MESSAGE = "⚠️ MindForge encountered a reflection error. Please check your connection or profile."
+
+# --- Optional Response Cache (opt-in via environment)
+
+RESPONSE_CACHE_ENABLED = os.getenv("MINDFORGE_RESPONSE_CACHE", "0") == "1"
+SEMANTIC_CACHE_THRESHOLD = os.getenv("MINDFORGE_SEMANTIC_CACHE_THRESHOLD")  # e.g. "0.97"; unset disables the tier
+
+def _new_response_cache():
+    return ResponseCache(
+        max_entries=int(os.getenv("MINDFORGE_RESPONSE_CACHE_SIZE", "256")),
+        ttl_seconds=float(os.getenv("MINDFORGE_RESPONSE_CACHE_TTL", "86400")),
+        semantic_threshold=float(SEMANTIC_CACHE_THRESHOLD) if SEMANTIC_CACHE_THRESHOLD else None,
+    )
+
+response_cache = _new_response_cache()  # Default user's cache
+_user_response_caches = {}
+
+def get_response_cache():
+    """Each user gets a private cache: their prompts and semantic matches never mix."""
+    user_id = get_current_user()
+    if user_id == DEFAULT_USER:
+        return response_cache
+    return _user_response_caches.setdefault(user_id, _new_response_cache())
+
+def _cache_lookup(user_input):
+    """Return (key, embedding, cached_response); all None when caching is off."""
+    if not RESPONSE_CACHE_ENABLED:
+        return None, None, None
+    cache = get_response_cache()
     system_prompt = load_active_prompt()
+    cache.check_prompt(system_prompt)  # A regenerated profile prompt drops every entry
+    key = cache_key(CHAT_MODEL, system_prompt, user_input, TEMPERATURE)
+    embedding = None
+    if cache.semantic_threshold is not None:
+        try:
+            embedding = get_embedding(normalize_input(user_input), get_client())
+        except Exception:
+            embedding = None
+    return key, embedding, cache.get(key, embedding)
+
+def _count_cache(s, key, cached):
+    if key is not None:
+        s.add("cache_hits" if cached is not None else "cache_misses")
+
+def _cache_store(key, embedding, response):
+    if key is not None and response and response != ERROR_MESSAGE:
+        get_response_cache().put(key, response, embedding)
+
+def build_request(user_input, memory=None):
+    messages = [{"role": "system", "content": load_active_prompt()}]
+    context = build_context(user_input, memory)  # Top-k similar past entries, token-budgeted
+    if context:
+        messages.append({"role": "system", "content": context})
+    messages.append({"role": "user", "content": user_input})
+    return {
+        "model": CHAT_MODEL,
+        "messages": messages,
+        "temperature": TEMPERATURE,
+        "max_tokens": 800,
+    }
+
+def handle_prompt(user_input, memory=None):
+    with span("gpt.handle_prompt") as s:
+        try:
+            key, embedding, cached = _cache_lookup(user_input)
+            _count_cache(s, key, cached)
+            if cached is not None:
+                return cached
+            response = get_client().chat.completions.create(**build_request(user_input, memory))  # Interactive lane
+            content = response.choices[0].message.content
+            _cache_store(key, embedding, content)
+            return content
+        except Exception as e:
+            s.set(error=type(e).__name__)
+            print(f"GPT ERROR: {e}")
+            return ERROR_MESSAGE
+
+async def handle_prompt_async(user_input, memory=None):
+    """Non-blocking variant of handle_prompt for use inside an event loop."""
+    with span("gpt.handle_prompt_async") as s:
+        try:
+            key, embedding, cached = await asyncio.to_thread(_cache_lookup, user_input)
+            _count_cache(s, key, cached)
+            if cached is not None:
+                return cached
+            client = get_async_client()
+            request = await asyncio.to_thread(build_request, user_input, memory)  # Retrieval is blocking work
+            response = await client.chat.completions.create(**request)
+            content = response.choices[0].message.content
+            _cache_store(key, embedding, content)
+            return content
+        except Exception as e:
+            s.set(error=type(e).__name__)
+            print(f"GPT ERROR: {e}")
+            return ERROR_MESSAGE
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input}
-            ],
-            temperature=0.7,
-            max_tokens=800,
-        )
-        return response.choices[0].message["content"]
-    except Exception as e:
-        print(f"GPT ERROR: {e}")
-        return "⚠️ MindForge encountered a reflection error. Please check your connection or profile."
+def stream_prompt(user_input, memory=None, status=None):
+    """
+    Streaming variant of handle_prompt: yields response text as tokens arrive.
+    Retries only cover opening the stream; a mid-stream failure ends with the error notice.
+    Pass a dict as `status` to learn the outcome: status["ok"] is False after a failure,
+    so callers can avoid persisting a partial reply.
+    """
+    status = status if status is not None else {}
+    status["ok"] = False
+    with span("gpt.stream_prompt") as s:
+        try:
+            key, embedding, cached = _cache_lookup(user_input)
+            _count_cache(s, key, cached)
+            if cached is not None:
+                status["ok"] = True
+                yield cached
+                return
+            started = time.perf_counter()
+            stream = get_client().chat.completions.create(stream=True, **build_request(user_input, memory))
+            parts = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not parts:
+                        s.set(first_token_ms=round((time.perf_counter() - started) * 1000, 3))
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            status["ok"] = True
+            _cache_store(key, embedding, "".join(parts))
+        except Exception as e:
+            status["ok"] = False
+            s.set(error=type(e).__name__)
+            print(f"GPT ERROR: {e}")
+            yield ERROR_MESSAGE
@@ -0,0 +1,188 @@
+# gpt/mock_server.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from core.memory.embedding_store import EMBEDDING_DIM
+from core.memory.fake_client import fake_vector  # Same vectors as the in-process fake client
+
+
+class MockOpenAIServer:
+    """
+    Local stand-in for the OpenAI HTTP API (chat completions, streaming and
+    embeddings) with an optional server-side request rate. Requests over the
+    rate get 429 + Retry-After, like the real API, so the client's limiter
+    and backoff can be exercised without network access or an API key.
+
+        with MockOpenAIServer(requests_per_second=5) as server:
+            client = OpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 requests_per_second: Optional[float] = None, retry_after: float = 0.2,
+                 dim: int = EMBEDDING_DIM, latency: float = 0.0):
+        self.requests_per_second = requests_per_second
+        self.retry_after = retry_after
+        self.dim = dim
+        self.latency = latency
+        self.log: List[Dict[str, Any]] = []  # One record per request: path, status, time
+        self._allowance = requests_per_second or 0.0
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, status: int) -> int:
+        with self._lock:
+            return sum(1 for record in self.log if record["status"] == status)
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _admit(self) -> bool:
+        """Server-side token bucket (capacity: one second of requests)."""
+        if not self.requests_per_second:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.requests_per_second,
+                                  self._allowance + (now - self._checked) * self.requests_per_second)
+            self._checked = now
+            if self._allowance < 1:
+                return False
+            self._allowance -= 1
+            return True
+
+    def _record(self, path: str, status: int) -> None:
+        with self._lock:
+            self.log.append({"path": path, "status": status, "time": time.time()})
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # Keep test output quiet
+                pass
+
+            def _json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                path = self.path.split("?")[0]
+
+                if not server._admit():
+                    server._record(path, 429)
+                    return self._json(429, {"error": {
+                        "message": "Rate limit reached (mock).", "type": "requests", "code": "rate_limit_exceeded",
+                    }}, headers={
+                        "Retry-After": f"{server.retry_after:g}",
+                        "retry-after-ms": str(int(server.retry_after * 1000)),
+                    })
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if path.endswith("/embeddings"):
+                    server._record(path, 200)
+                    return self._json(200, self._embeddings(request))
+                if path.endswith("/chat/completions"):
+                    server._record(path, 200)
+                    if request.get("stream"):
+                        return self._stream(request)
+                    return self._json(200, self._completion(request))
+                server._record(path, 404)
+                return self._json(404, {"error": {"message": f"Unknown path {path}", "type": "invalid_request_error"}})
+
+            def _embeddings(self, request):
+                inputs = request.get("input", [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                tokens = sum(len(str(text)) // 4 + 1 for text in inputs)
+                return {
+                    "object": "list",
+                    "model": request.get("model", "mock"),
+                    "data": [{"object": "embedding", "index": i, "embedding": fake_vector(str(text), server.dim)}
+                             for i, text in enumerate(inputs)],
+                    "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                }
+
+            def _reply(self, request) -> str:
+                last = next((m.get("content", "") for m in reversed(request.get("messages", []))
+                             if m.get("role") == "user"), "")
+                return f"Reflection on: {last}"
+
+            def _completion(self, request):
+                return {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": self._reply(request)}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }
+
+            def _stream(self, request):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for word in self._reply(request).split(" "):
+                    chunk = {
+                        "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": request.get("model", "mock"),
+                        "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    # Serve locally; point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock OpenAI API for local testing")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rps", type=float, default=None, help="Requests/second before answering 429")
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(port=args.port, requests_per_second=args.rps,
+                              retry_after=args.retry_after, latency=args.latency)
+    print(f"Mock OpenAI API on {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
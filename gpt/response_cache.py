@@ -0,0 +1,97 @@
+# gpt/response_cache.py
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+def normalize_input(text: str) -> str:
+    """Case- and whitespace-insensitive form of a user thought."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def cache_key(model: str, system_prompt: str, user_input: str, temperature: float) -> str:
+    raw = "\x00".join([model, system_prompt, normalize_input(user_input), f"{temperature:.3f}"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of GPT responses with a size cap.
+
+    Exact tier: keyed by cache_key(). Optional semantic tier: reuses a cached
+    answer when the input embedding's cosine similarity to a cached input
+    reaches `semantic_threshold`. Everything is dropped when the active
+    system prompt changes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 24 * 3600,
+                 semantic_threshold: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._prompt_hash: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def check_prompt(self, system_prompt: str) -> None:
+        """Invalidate everything if the profile's generated prompt changed."""
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            if prompt_hash != self._prompt_hash:
+                self._entries.clear()
+                self._prompt_hash = prompt_hash
+
+    def _expired(self, record: dict, now: float) -> bool:
+        return self.ttl_seconds is not None and now - record["stored_at"] > self.ttl_seconds
+
+    def get(self, key: str, embedding: Optional[np.ndarray] = None) -> Optional[str]:
+        """Exact lookup first, then (if enabled and `embedding` given) semantic lookup."""
+        now = time.time()
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                if not self._expired(record, now):
+                    self._entries.move_to_end(key)
+                    return record["response"]
+                del self._entries[key]
+
+            if self.semantic_threshold is None or embedding is None:
+                return None
+            best_key, best_score = None, self.semantic_threshold
+            query = embedding / (np.linalg.norm(embedding) or 1.0)
+            for candidate_key, candidate in list(self._entries.items()):
+                if self._expired(candidate, now):
+                    del self._entries[candidate_key]
+                    continue
+                if candidate["embedding"] is None:
+                    continue
+                score = float(candidate["embedding"] @ query)
+                if score >= best_score:
+                    best_key, best_score = candidate_key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key]["response"]
+
+    def put(self, key: str, response: str, embedding: Optional[np.ndarray] = None) -> None:
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        with self._lock:
+            self._entries[key] = {"response": response, "embedding": embedding, "stored_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,66 @@
+# gpt/retrieval.py
+
+from typing import Any, Dict, List, Optional
+
+from core.memory.vector_index import semantic_search
+
+CONTEXT_TOP_K = 5
+CONTEXT_TOKEN_BUDGET = 1200
+MAX_ENTRY_TOKENS = 300
+
+try:  # Optional: exact counts when tiktoken is installed
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken when available, else ~4 characters per token."""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens]) + "…"
+    return text[:max_tokens * 4] + "…"
+
+
+def format_entry(entry: Dict[str, Any]) -> str:
+    half = MAX_ENTRY_TOKENS // 2
+    return (
+        f"[{entry.get('timestamp', '')}]\n"
+        f"Thought: {_truncate(entry.get('thought', ''), half)}\n"
+        f"Reflection: {_truncate(entry.get('response', ''), half)}"
+    )
+
+
+def build_context(user_input: str, memory: Optional[List[Dict[str, Any]]],
+                  k: int = CONTEXT_TOP_K, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Pack the k past entries most similar to `user_input` into a context block
+    that fits `token_budget`. Uses the in-memory journal index, so only the
+    new input may need an embedding call. Returns "" when nothing applies.
+    """
+    if not memory or not user_input.strip():
+        return ""
+    try:
+        matches = semantic_search(user_input, memory, k)
+    except Exception:
+        return ""
+
+    blocks, used = [], 0
+    for entry in matches:
+        block = format_entry(entry)
+        cost = estimate_tokens(block)
+        if used + cost > token_budget:
+            break
+        blocks.append(block)
+        used += cost
+    if not blocks:
+        return ""
+    return "Relevant past reflections from this user's journal:\n\n" + "\n\n".join(blocks)
@@ -1,17 +1,15 @@
 # init.py
 
 import streamlit as st
-import openai
-import os
-from core.memory.user_profile import save_user_profile
-
-# --- API Key Setup
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from gpt.client import get_client  # Shared, rate-limited client
+from core.memory.utils import save_user_profile
+from utils.session_user import activate_session_user
 
 # --- Page Setup
 st.set_page_config(page_title="MindForge Onboarding", layout="centered")
 st.title("🧠 MindForge")
 st.subheader("Install your recursive identity mirror")
+activate_session_user()  # The profile is saved into this user's shard
 
 # --- Basic Identity Inputs
 name = st.text_input("📝 Name")
@@ -53,7 +51,7 @@ if st.button("⚙️ Forge My Adaptive Mirror"):
         )
 
         try:
-            response = openai.ChatCompletion.create(
+            response = get_client().chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {
@@ -73,7 +71,7 @@ if st.button("⚙️ Forge My Adaptive Mirror"):
                 max_tokens=1000
             )
 
-            adaptive_prompt = response.choices[0].message["content"]
+            adaptive_prompt = response.choices[0].message.content
 
             # Save to profile system
             save_user_profile(
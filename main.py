@@ -1,14 +1,21 @@
 import streamlit as st
 import datetime
-from gpt.gpt_handler import handle_prompt
-from core.memory.session_memory import load_session_memory, save_session_memory
-from core.memory.memory_engine import calculate_alignment_score
+from gpt.gpt_handler import stream_prompt
+from core.memory.session_memory import load_session_memory, append_session_entry, load_session_page, count_session_entries
+from core.memory.memory_engine import alignment_stats_current, current_alignment_score
+from core.memory.job_queue import enqueue_entry, enqueue_job, pending_entry_ids, start_workers
 from utils.logger import log_info, log_error
+from utils.timeline import render_timeline
+from utils.session_user import activate_session_user
+from utils.metrics import start_metrics_server
 
 # --- UI Setup
 st.set_page_config(page_title="MindForge – Reflect to Evolve", layout="wide")
 st.title("🧠 MindForge")
 st.subheader("Forge Insight. Refine Identity. Evolve Continuously.")
+activate_session_user()  # Every read and write below goes to this user's shard
+start_workers()  # Background embedding, scoring and clustering (started once per process)
+start_metrics_server()  # /metrics for Prometheus when MINDFORGE_METRICS=1 and a port is set
 
 # --- Load Memory and State
 memory = load_session_memory()
@@ -40,36 +47,48 @@ if submit:
         st.warning("Please enter a prompt.")
     else:
         try:
-            response = handle_prompt(user_input)
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            entry = {
-                "timestamp": timestamp,
-                "thought": user_input.strip(),
-                "response": response,
-                "tag": tag_input.strip()
-            }
-            memory.append(entry)
-            save_session_memory(memory)
-            log_info("Thought submitted and saved.")
+            # --- Stream the reflection as it is generated, then persist the full text
             st.success("🧠 MindForge Response:")
-            st.markdown(f"> {response}")
-
-            # --- Badge Trigger Example
-            if "#mask" in tag_input.lower() and "Mask" not in st.session_state.badges:
-                st.session_state.badges.append("Mask")
-                st.toast("🏅 New badge earned: Mask")
+            stream_status = {}
+            response = st.write_stream(stream_prompt(user_input, memory, status=stream_status))
+            if not stream_status.get("ok"):
+                # Partial text plus the error notice: shown, but kept out of the journal
+                log_error("Reflection stream failed; entry not saved.", user=st.session_state["user_id"])
+                st.warning("The reflection was interrupted, so this entry was not saved. Please try again.")
+            else:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                entry = {
+                    "timestamp": timestamp,
+                    "thought": user_input.strip(),
+                    "response": response,
+                    "tag": tag_input.strip()
+                }
+                append_session_entry(entry)
+                memory.append(entry)
+                enqueue_entry(entry)  # Scoring, clustering and indexing run on the job workers
+                log_info("Thought submitted and saved.", entry_id=entry["id"], user=st.session_state["user_id"])
+
+                # --- Badge Trigger Example
+                if "#mask" in tag_input.lower() and "Mask" not in st.session_state.badges:
+                    st.session_state.badges.append("Mask")
+                    st.toast("🏅 New badge earned: Mask")
 
         except Exception as e:
-            log_error(f"Error handling input: {str(e)}")
+            log_error(f"Error handling input: {str(e)}", error=type(e).__name__)
             st.error(f"Something went wrong: {str(e)}")
 
 # --- RCA Scoring + Level Display
 if memory:
-    score = calculate_alignment_score(memory)
+    pending = pending_entry_ids()
+    if not pending and not alignment_stats_current(memory):
+        enqueue_job("alignment", dedupe=True)  # Backfill older entries off the request path
+    score = current_alignment_score()  # Precomputed running mean; never embeds here
     level = get_user_level(score)
 
     st.sidebar.subheader("📈 RCA Alignment Score")
     st.sidebar.metric(label="Score", value=f"{score:.2f} / 1.0")
+    if pending:
+        st.sidebar.caption(f"⏳ {len(pending)} reflection(s) still being scored…")
     st.sidebar.subheader("🧩 Cognitive Level")
     st.sidebar.metric(label="Level", value=f"{level}/10")
 
@@ -121,10 +140,4 @@ st.info(f"🧭 Active Champion: **{selected}**")
 if show_history and memory:
     st.markdown("---")
     st.subheader("📜 Journal Timeline")
-    for entry in reversed(memory[-10:]):
-        st.markdown(f"**{entry['timestamp']}**")
-        if entry.get("tag"):
-            st.markdown(f"🏷️ *{entry['tag']}*")
-        st.code(f"🗯️ {entry['thought']}")
-        st.success(f"🔁 {entry['response']}")
-        st.markdown("---")
\ No newline at end of file
+    render_timeline(load_session_page, count_session_entries(), key="journal", page_size=10)
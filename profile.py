@@ -1,21 +1,20 @@
 import streamlit as st
-import json
-import os
 from pathlib import Path
 from core.memory.utils import save_user_profile
-import openai
+from core.memory.user_storage import user_file
+from utils.session_user import activate_session_user
+from utils.file_cache import load_json_cached
+from gpt.client import get_client  # Shared, rate-limited client
 
-# --- API Setup
-openai.api_key = os.getenv("OPENAI_API_KEY")
-PROFILE_PATH = Path("database/user_profile.json")
+activate_session_user()
+PROFILE_PATH = Path(user_file("database/user_profile.json"))
 
 # --- Load Profile
 if not PROFILE_PATH.exists():
     st.warning("No profile found. Please complete onboarding first.")
     st.stop()
 
-with PROFILE_PATH.open("r") as f:
-    profile = json.load(f)
+profile = load_json_cached(PROFILE_PATH, default={})
 
 # --- Page Config
 st.set_page_config(page_title="MindForge – Identity Profile", layout="centered")
@@ -56,7 +55,7 @@ if st.button("🔄 Regenerate Adaptive Mirror"):
         )
 
         try:
-            response = openai.ChatCompletion.create(
+            response = get_client().chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": (
@@ -71,7 +70,7 @@ if st.button("🔄 Regenerate Adaptive Mirror"):
                 max_tokens=1000
             )
 
-            updated_prompt = response.choices[0].message["content"]
+            updated_prompt = response.choices[0].message.content
 
             save_user_profile(
                 name=name,
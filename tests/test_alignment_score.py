@@ -0,0 +1,110 @@
+# tests/test_alignment_score.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import embedding_store, memory_engine
+from core.memory.fake_client import FakeOpenAIClient
+
+
+def test_running_mean_matches_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    monkeypatch.setattr(memory_engine, "ALIGNMENT_STATS_FILE", str(tmp_path / "stats.json"))
+    client = FakeOpenAIClient(dim=4)
+    monkeypatch.setattr(memory_engine, "get_client", lambda: client)
+
+    memory = [{"thought": f"thought {i}", "response": f"response {i}"} for i in range(6)]
+    memory.append({"thought": "", "response": "empty thought"})
+    memory_engine.calculate_alignment_score(memory)
+    assert all("alignment" in entry for entry in memory)
+
+    entry = {"thought": "new thought", "response": "new response"}
+    memory_engine.score_entry(entry)
+    memory.append(entry)
+    memory_engine.update_alignment_stats(entry["alignment"])
+
+    requests_before = client.request_count
+    incremental = memory_engine.calculate_alignment_score(memory)
+    assert client.request_count == requests_before
+
+    positives = [e["alignment"] for e in memory if e["alignment"] > 0]
+    expected = round(sum(positives) / len(positives), 3) if positives else 0.0
+    assert incremental == expected
+
+
+def test_vectorized_scores_match_pairwise_cosine():
+    rng = np.random.default_rng(0)
+    thoughts = rng.standard_normal((50, 16)).astype(np.float32)
+    responses = rng.standard_normal((50, 16)).astype(np.float32)
+    thoughts[3] = 0.0
+
+    scores = memory_engine.alignment_scores(thoughts, responses)
+
+    assert scores.dtype == np.float32 and scores.shape == (50,)
+    assert scores[3] == 0.0
+    for i in (0, 17, 49):
+        expected = memory_engine.cosine_similarity(thoughts[i].tolist(), responses[i].tolist())
+        assert abs(scores[i] - expected) < 1e-3
+
+
+def test_edit_with_same_count_invalidates_running_mean(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_engine, "ALIGNMENT_STATS_FILE", str(tmp_path / "stats.json"))
+    memory = [{"id": i, "thought": f"t{i}", "response": f"r{i}", "alignment": 0.5} for i in range(4)]
+    assert memory_engine.calculate_alignment_score(memory) == 0.5
+    assert memory_engine.alignment_stats_current(memory)
+
+    # Delete one entry and append another: the count is unchanged but the scores are not
+    memory = memory[1:] + [{"id": 4, "thought": "t4", "response": "r4", "alignment": 0.9}]
+    assert not memory_engine.alignment_stats_current(memory)
+    assert memory_engine.calculate_alignment_score(memory) == round((0.5 * 3 + 0.9) / 4, 3)
+
+    # The O(1) update path keeps the fingerprint in step with a full rebuild
+    memory.append({"id": 5, "thought": "t5", "response": "r5", "alignment": 0.7})
+    memory_engine.update_alignment_stats(0.7, 5)
+    assert memory_engine.alignment_stats_current(memory)
+
+
+def test_backfill_only_persists_this_journals_entries(tmp_path, monkeypatch):
+    from core.memory import session_memory
+
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(tmp_path / "memory_store.json"))
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    monkeypatch.setattr(memory_engine, "ALIGNMENT_STATS_FILE", str(tmp_path / "stats.json"))
+    client = FakeOpenAIClient(dim=4)
+    monkeypatch.setattr(memory_engine, "get_client", lambda: client)
+    session_memory.append_session_entries([{"thought": "real", "response": "entry"}, {"thought": "b", "response": "c"}])
+
+    # Same ids as the journal but different text (a synthetic list), plus an unknown id
+    memory_engine.calculate_alignment_score([{"id": 0, "thought": "synthetic", "response": "x"},
+                                             {"id": 9, "thought": "unknown", "response": "y"}])
+    assert all("alignment" not in entry for entry in session_memory.load_session_memory())
+
+    # A filtered view of the real journal is persisted
+    memory_engine.calculate_alignment_score(session_memory.load_session_memory()[1:])
+    stored = session_memory.load_session_memory()
+    assert "alignment" not in stored[0] and "alignment" in stored[1]
+
+
+def test_embedding_failure_leaves_entry_unscored(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    client = FakeOpenAIClient(dim=4)
+
+    def outage(**kwargs):
+        raise ConnectionError("API down")
+    client.embeddings.create = outage
+    monkeypatch.setattr(memory_engine, "get_client", lambda: client)
+
+    entry = {"thought": "a thought", "response": "a response"}
+    with pytest.raises(RuntimeError):
+        memory_engine.score_entry(entry)
+    assert "alignment" not in entry  # Retried later instead of pinned at 0.0
+
+    empty = {"thought": "", "response": "nothing to compare"}
+    assert memory_engine.score_entry(empty) == 0.0 and empty["alignment"] == 0.0
@@ -0,0 +1,50 @@
+# tests/test_analytics.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import analytics
+
+
+def _entries(start, count, day="2025-05-28"):
+    return [
+        {"id": i, "timestamp": f"{day} 12:00:{i % 60:02d}", "thought": "t" * i, "response": "r",
+         "tag": "#loop" if i % 2 else "", "alignment": 0.5 + (i % 3) / 10}
+        for i in range(start, start + count)
+    ]
+
+
+def test_frame_is_typed_and_appended_incrementally():
+    analytics.reset_analytics_cache()
+    memory = _entries(0, 10)
+    frame = analytics.get_analytics_frame(memory)
+
+    assert frame["timestamp"].dtype == "datetime64[ns]" or str(frame["timestamp"].dtype).startswith("datetime64")
+    assert frame["thought_len"].dtype == np.int32
+    assert isinstance(frame["tag"].dtype, pd.CategoricalDtype)
+
+    memory += _entries(10, 5, day="2025-05-29")
+    grown = analytics.get_analytics_frame(memory)
+    rebuilt = analytics.build_frame(memory)
+    assert isinstance(grown["tag"].dtype, pd.CategoricalDtype)
+    assert grown["thought_len"].tolist() == rebuilt["thought_len"].tolist()
+
+
+def test_daily_aggregates_match_groupby_and_pick_up_late_scores():
+    analytics.reset_analytics_cache()
+    memory = _entries(0, 6) + _entries(6, 6, day="2025-05-29")
+    memory[7].pop("alignment")
+    analytics.get_analytics_frame(memory)
+
+    memory += _entries(12, 3, day="2025-05-29")
+    memory[7]["alignment"] = 0.9
+
+    trend = analytics.daily_alignment(memory)
+    expected = analytics.build_frame(memory).groupby("date")["alignment"].mean()
+    assert np.allclose(trend["alignment"].to_numpy(), expected.to_numpy())
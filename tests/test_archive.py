@@ -0,0 +1,51 @@
+# tests/test_archive.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import archive, embedding_store, session_memory
+from core.memory.fake_client import FakeOpenAIClient
+
+
+@pytest.fixture
+def tmp_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(tmp_path / "memory_store.json"))
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_round_trip_with_embeddings(tmp_store, monkeypatch, fmt):
+    monkeypatch.setattr(archive, "CHUNK_ROWS", 2)
+    entries = [
+        {"id": i, "timestamp": f"2025-05-28 12:00:0{i}", "thought": f"thought {i}",
+         "response": f"response {i}", "tag": "#loop", "alignment": 0.25 * i, "cluster": 3}
+        for i in range(5)
+    ]
+    entries[4]["tag"] = None
+    embedding_store.get_embeddings(["thought 0", "thought 3"], FakeOpenAIClient(dim=8))
+
+    data = archive.export_archive(entries, fmt=fmt, dim=8)
+    table = archive.read_archive(data)
+    assert table.num_rows == 5
+    vectors = table.column("thought_embedding").combine_chunks().values.to_numpy().reshape(5, 8)
+    assert np.count_nonzero(vectors.any(axis=1)) == 2
+
+    embedding_store.EMBEDDING_DB = str(tmp_store / "fresh.sqlite")
+    assert archive.import_archive(data) == 5
+
+    memory = session_memory.load_session_memory()
+    assert [entry["thought"] for entry in memory] == [entry["thought"] for entry in entries]
+    assert memory[2]["alignment"] == pytest.approx(0.5)
+    assert all("cluster" not in entry for entry in memory)  # Source journal's cluster ids are dropped
+    assert "tag" not in memory[4] and memory[3]["tag"] == "#loop"
+    restored = embedding_store.get_cached_embeddings(["thought 3", "thought 1"])
+    assert restored[0] is not None and restored[1] is None
+    assert np.allclose(np.linalg.norm(restored[0]), 1.0, atol=1e-5)
@@ -0,0 +1,27 @@
+# tests/test_benchmarks.py
+
+import sys
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks import hot_paths
+
+
+def test_hot_path_report_shape_and_regression_check():
+    report = hot_paths.run(sizes=[40], repeat=2, dim=8)
+
+    ops = {result["op"] for result in report["results"]}
+    assert {"load_session_memory_cold", "save_session_memory", "calculate_alignment_score_cached",
+            "cluster_thoughts", "build_frame", "keyword_search", "semantic_search"} <= ops
+    assert all(result["p95_ms"] >= result["p50_ms"] >= 0 and result["peak_mb"] >= 0 for result in report["results"])
+
+    slower = {"results": [dict(result, p95_ms=result["p95_ms"] * 10 + 1) for result in report["results"]]}
+    assert hot_paths.compare(report, report, threshold=1.25) == []
+    assert len(hot_paths.compare(slower, report, threshold=1.25)) == len(report["results"])
+
+
+def test_synthetic_journal_is_deterministic():
+    assert hot_paths.synthetic_entries(5, seed=1) == hot_paths.synthetic_entries(5, seed=1)
+    assert hot_paths.synthetic_entries(5, seed=1) != hot_paths.synthetic_entries(5, seed=2)
@@ -0,0 +1,113 @@
+# tests/test_cluster_engine.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import cluster_engine, embedding_store, session_memory
+from core.memory.fake_client import FakeOpenAIClient
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    client = FakeOpenAIClient(dim=8)
+    monkeypatch.setattr(cluster_engine, "get_client", lambda: client)
+    monkeypatch.setattr(cluster_engine, "EMBEDDING_DIM", 8)
+    monkeypatch.setattr(cluster_engine, "CENTROIDS_FILE", str(tmp_path / "centroids.npy"))
+    monkeypatch.setattr(cluster_engine, "CLUSTER_META_FILE", str(tmp_path / "meta.json"))
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(tmp_path / "memory_store.json"))
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+    for i in range(12):
+        session_memory.append_session_entry({"thought": f"thought {i}", "response": "r"})
+    return client
+
+
+def test_assignments_are_stored_and_reused(store):
+    memory = session_memory.load_session_memory()
+    clusters = cluster_engine.cluster_thoughts(memory, num_clusters=3)
+    assert sorted(clusters) == [0, 1, 2]
+    assert sum(len(entries) for entries in clusters.values()) == 12
+
+    reloaded = session_memory.load_session_memory()
+    assert all("cluster" in entry for entry in reloaded)
+
+    requests_before = store.request_count
+    again = cluster_engine.cluster_thoughts(reloaded, num_clusters=3)
+    assert store.request_count == requests_before
+    assert {k: [e["id"] for e in v] for k, v in again.items()} == \
+           {k: [e["id"] for e in v] for k, v in clusters.items()}
+
+
+def test_new_entry_is_assigned_incrementally(store):
+    cluster_engine.fit_clusters(session_memory.load_session_memory(), num_clusters=3)
+    entry = session_memory.append_session_entry({"thought": "a brand new thought", "response": "r"})
+
+    cluster = cluster_engine.assign_entry_cluster(entry)
+
+    assert cluster in (0, 1, 2)
+    assert session_memory.load_session_memory()[-1]["cluster"] == cluster
+
+
+def test_entry_that_fails_to_embed_is_left_unassigned(store, monkeypatch):
+    cluster_engine.fit_clusters(session_memory.load_session_memory(), num_clusters=3)
+    entry = session_memory.append_session_entry({"thought": "a brand new thought", "response": "r"})
+
+    def fail(**kwargs):
+        raise ConnectionError("embeddings endpoint down")
+
+    monkeypatch.setattr(store.embeddings, "create", fail)
+    assert cluster_engine.assign_entry_cluster(entry) is None
+    assert "cluster" not in session_memory.get_session_entry(entry["id"])
+
+    clusters = cluster_engine.cluster_thoughts(session_memory.load_session_memory(), num_clusters=3)
+    assert entry["id"] not in {e["id"] for entries in clusters.values() for e in entries}
+    assert "cluster" not in session_memory.get_session_entry(entry["id"])
+
+
+def test_labels_are_cached_until_membership_drifts(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(cluster_engine, "CLUSTER_LABELS_FILE", str(tmp_path / "labels.json"))
+    calls = []
+    monkeypatch.setattr(cluster_engine, "generate_cluster_label",
+                        lambda thoughts: calls.append(thoughts) or f"#label{len(calls)}")
+
+    entries = [{"id": i, "thought": f"t{i}"} for i in range(10)]
+    clusters = {0: entries[:5], 1: entries[5:]}
+    first = cluster_engine.label_clusters(clusters)
+    assert len(calls) == 2
+
+    clusters[1] = entries[5:] + [{"id": 10, "thought": "t10"}]  # small drift
+    assert cluster_engine.label_clusters(clusters) == first
+    assert len(calls) == 2
+
+    clusters[0] = [{"id": i, "thought": f"n{i}"} for i in range(20, 25)]  # replaced membership
+    assert cluster_engine.cached_cluster_labels(clusters) == {1: first[1]}  # Read-only: no call
+    assert len(calls) == 2
+    relabeled = cluster_engine.label_clusters(clusters)
+    assert len(calls) == 3
+    assert relabeled[1] == first[1] and relabeled[0] != first[0]
+    assert cluster_engine.cached_cluster_labels(clusters) == relabeled
+
+
+def test_label_calls_stay_in_the_callers_priority_lane(store, monkeypatch, tmp_path):
+    from gpt import client as gpt_client
+
+    monkeypatch.setattr(cluster_engine, "CLUSTER_LABELS_FILE", str(tmp_path / "labels.json"))
+    limited = gpt_client.RateLimitedClient(FakeOpenAIClient(dim=8))
+    monkeypatch.setattr(cluster_engine, "get_client", lambda: limited)
+    lanes = []
+    limiter = gpt_client.get_limiter("chat")
+    real_acquire = limiter.acquire
+    monkeypatch.setattr(limiter, "acquire",
+                        lambda tokens, priority=gpt_client.INTERACTIVE: lanes.append(priority) or real_acquire(tokens, priority))
+
+    clusters = {i: [{"id": i * 10 + j, "thought": f"c{i} t{j}"} for j in range(3)] for i in range(3)}
+    with gpt_client.request_priority(gpt_client.BACKGROUND):
+        labels = cluster_engine.label_clusters(clusters)
+
+    assert len(labels) == 3
+    assert lanes == [gpt_client.BACKGROUND] * 3
@@ -0,0 +1,45 @@
+# tests/test_embedding_store.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import embedding_store
+from core.memory.embedding_batch import chunk_texts, embed_in_batches
+from core.memory.fake_client import FakeOpenAIClient, fake_vector
+
+
+def test_each_text_is_embedded_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    client = FakeOpenAIClient(dim=8)
+
+    first = embedding_store.get_embeddings(["alpha", "beta", "alpha"], client)
+    second = embedding_store.get_embeddings(["beta", "alpha", "gamma"], client)
+
+    assert client.input_count == 3
+    assert client.request_count == 2
+    assert first[0].dtype == np.float32
+    assert np.array_equal(first[1], second[0])
+
+
+def test_key_depends_on_model():
+    assert embedding_store.embedding_key("x", "a") != embedding_store.embedding_key("x", "b")
+
+
+def test_chunks_respect_token_and_input_limits():
+    texts = ["x" * 40] * 10  # ~11 tokens each
+    assert [len(c) for c in chunk_texts(texts, max_tokens=25)] == [2, 2, 2, 2, 2]
+    assert [len(c) for c in chunk_texts(texts, max_inputs=4)] == [4, 4, 2]
+
+
+def test_batches_map_back_to_inputs():
+    client = FakeOpenAIClient(dim=8)
+    texts = [f"entry {i}" for i in range(7)]
+    vectors = embed_in_batches(texts, client, "m", max_inputs=3)
+
+    assert client.request_count == 3
+    assert vectors == [fake_vector(text, 8) for text in texts]
@@ -0,0 +1,41 @@
+# tests/test_file_cache.py
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils import file_cache
+
+
+def test_unchanged_file_is_not_reparsed(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"generated_prompt": "v1"}), encoding="utf-8")
+    parses = []
+
+    def parser(p):
+        parses.append(p)
+        with open(p, encoding="utf-8") as f:
+            return json.load(f)
+
+    assert file_cache.load_cached(path, parser)["generated_prompt"] == "v1"
+    assert file_cache.load_cached(path, parser)["generated_prompt"] == "v1"
+    assert len(parses) == 1
+
+    path.write_text(json.dumps({"generated_prompt": "v2!"}), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert file_cache.load_cached(path, parser)["generated_prompt"] == "v2!"
+    assert len(parses) == 2
+
+
+def test_load_json_cached_returns_private_copy(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"answers": ["a"]}), encoding="utf-8")
+
+    first = file_cache.load_json_cached(path)
+    first["answers"].append("mutated")
+    assert file_cache.load_json_cached(path) == {"answers": ["a"]}
+    assert file_cache.load_json_cached(tmp_path / "missing.json", default={}) == {}
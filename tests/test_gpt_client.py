@@ -0,0 +1,132 @@
+# tests/test_gpt_client.py
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from gpt import client as gpt_client
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(gpt_client, "backoff_delay", lambda attempt: 0)
+
+
+def test_transient_errors_are_retried():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise StatusError(429)
+        return "ok"
+
+    assert gpt_client.call_with_retries(flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_client_errors_are_not_retried():
+    attempts = []
+
+    def bad_request():
+        attempts.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        gpt_client.call_with_retries(bad_request)
+    assert len(attempts) == 1
+
+
+def test_async_calls_respect_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(gpt_client, "MAX_CONCURRENCY", 2)
+    active, peak = [0], [0]
+
+    async def call():
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return "done"
+
+    async def run():
+        return await asyncio.gather(*(gpt_client.acall_with_retries(call) for _ in range(6)))
+
+    assert asyncio.run(run()) == ["done"] * 6
+    assert peak[0] == 2
+
+
+
+def test_interactive_lane_is_served_before_background(monkeypatch):
+    import threading
+    import time
+
+    monkeypatch.setattr(gpt_client, "BACKGROUND_RESERVE", 0.0)
+    limiter = gpt_client.EndpointLimiter("test", rpm=240, tpm=1_000_000)
+    limiter.requests.level = 0  # Exhausted; refills one request every 0.25s
+    order = []
+
+    def call(priority, name):
+        limiter.acquire(1, priority)
+        order.append(name)
+
+    background = threading.Thread(target=call, args=(gpt_client.BACKGROUND, "background"))
+    background.start()
+    time.sleep(0.05)
+    call(gpt_client.INTERACTIVE, "interactive")
+    background.join()
+    assert order == ["interactive", "background"]
+
+
+def test_mock_server_429s_pause_the_endpoint(monkeypatch):
+    from openai import OpenAI
+    from gpt.mock_server import MockOpenAIServer
+
+    monkeypatch.setattr(gpt_client, "_limiters", {})
+    with MockOpenAIServer(requests_per_second=4, retry_after=0.1, dim=8) as server:
+        client = gpt_client.RateLimitedClient(OpenAI(base_url=server.base_url, api_key="test", max_retries=0))
+        for i in range(8):
+            response = client.embeddings.create(input=[f"text {i}"], model="mock")
+            assert len(response.data[0].embedding) == 8
+        reply = client.chat.completions.create(model="mock", messages=[{"role": "user", "content": "hi"}])
+
+        assert reply.choices[0].message.content == "Reflection on: hi"
+        assert server.count(429) >= 1  # Throttled, retried after Retry-After, and every call succeeded
+        assert gpt_client.get_limiter("embeddings").scale < 1.0
+
+
+def test_stream_holds_its_slot_until_consumed(monkeypatch):
+    import threading
+
+    from openai import OpenAI
+    from gpt.mock_server import MockOpenAIServer
+
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(gpt_client, "_sync_slots", slots)
+    monkeypatch.setattr(gpt_client, "_limiters", {})
+    request = {"model": "mock", "messages": [{"role": "user", "content": "hi there"}], "stream": True}
+    with MockOpenAIServer(dim=8) as server:
+        client = gpt_client.RateLimitedClient(OpenAI(base_url=server.base_url, api_key="test", max_retries=0))
+
+        stream = client.chat.completions.create(**request)
+        assert not slots.acquire(blocking=False)  # Still streaming: the slot is taken
+        text = "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+        assert text.strip() == "Reflection on: hi there"
+        assert slots.acquire(blocking=False)  # Exhausted: released
+        slots.release()
+
+        stream = client.chat.completions.create(**request)
+        next(iter(stream))
+        stream.close()  # Abandoned mid-stream
+        assert slots.acquire(blocking=False)
+        slots.release()
@@ -0,0 +1,53 @@
+# tests/test_gpt_handler.py
+
+import sys
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from gpt import gpt_handler
+from core.memory.fake_client import FakeOpenAIClient
+
+
+def test_stream_prompt_yields_full_reflection(monkeypatch):
+    client = FakeOpenAIClient(dim=4)
+    monkeypatch.setattr(gpt_handler, "get_client", lambda: client)
+
+    chunks = list(gpt_handler.stream_prompt("I keep looping"))
+
+    assert len(chunks) > 1
+    assert "".join(chunks).strip() == gpt_handler.handle_prompt("I keep looping")
+
+
+def test_stream_prompt_reports_mid_stream_failure(monkeypatch):
+    client = FakeOpenAIClient(dim=4)
+    monkeypatch.setattr(gpt_handler, "get_client", lambda: client)
+    status = {}
+    assert "".join(gpt_handler.stream_prompt("fine", status=status))
+    assert status["ok"] is True
+
+    def broken_stream(content, model):
+        yield from list(FakeOpenAIClient._stream_chat(client, content, model))[:2]
+        raise ConnectionError("stream dropped")
+    monkeypatch.setattr(client, "_stream_chat", broken_stream)
+
+    chunks = list(gpt_handler.stream_prompt("this will break", status=status))
+    assert chunks[-1] == gpt_handler.ERROR_MESSAGE and len(chunks) == 3
+    assert status["ok"] is False
+
+
+def test_context_is_packed_within_budget(monkeypatch):
+    from gpt import retrieval
+
+    past = [{"id": i, "timestamp": f"2025-01-0{i + 1}", "thought": f"loop {i} " * 40, "response": "r " * 40}
+            for i in range(5)]
+    monkeypatch.setattr(retrieval, "semantic_search", lambda query, memory, k: memory[:k])
+
+    context = retrieval.build_context("loop", past, k=5, token_budget=250)
+    assert context.count("Thought:") == 2
+    assert retrieval.estimate_tokens(context) <= 250 + 20
+
+    request = gpt_handler.build_request("loop", past)
+    assert [m["role"] for m in request["messages"]] == ["system", "system", "user"]
+    assert gpt_handler.build_request("loop")["messages"][-1] == {"role": "user", "content": "loop"}
@@ -0,0 +1,21 @@
+# tests/test_import_time.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.import_time import measure_import
+
+
+@pytest.mark.parametrize("module", [
+    "core.memory.memory_engine",
+    "core.memory.cluster_engine",
+    "gpt.gpt_handler",
+])
+def test_import_does_not_load_heavy_libraries(module):
+    report = measure_import(module)
+    assert report["loaded"] == []
@@ -0,0 +1,116 @@
+# tests/test_job_queue.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import (
+    cluster_engine, embedding_store, job_queue, keyword_index, memory_engine, session_memory, vector_index,
+)
+from core.memory.fake_client import FakeOpenAIClient
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    client = FakeOpenAIClient(dim=8)
+    for module in (memory_engine, cluster_engine, vector_index):
+        monkeypatch.setattr(module, "get_client", lambda: client)
+    monkeypatch.setattr(cluster_engine, "EMBEDDING_DIM", 8)
+    monkeypatch.setattr(cluster_engine, "CENTROIDS_FILE", str(tmp_path / "centroids.npy"))
+    monkeypatch.setattr(cluster_engine, "CLUSTER_META_FILE", str(tmp_path / "meta.json"))
+    monkeypatch.setattr(cluster_engine, "CLUSTER_LABELS_FILE", str(tmp_path / "labels.json"))
+    monkeypatch.setattr(embedding_store, "EMBEDDING_DB", str(tmp_path / "emb.sqlite"))
+    monkeypatch.setattr(memory_engine, "ALIGNMENT_STATS_FILE", str(tmp_path / "stats.json"))
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_FILE", str(tmp_path / "keywords.json"))
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(tmp_path / "memory_store.json"))
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+    monkeypatch.setattr(job_queue, "JOBS_DB", str(tmp_path / "jobs.sqlite"))
+    return client
+
+
+def test_saved_entry_is_processed_in_background(queue, monkeypatch):
+    monkeypatch.setattr(cluster_engine, "generate_cluster_label", lambda thoughts: "#label")
+    for i in range(6):
+        session_memory.append_session_entry({"thought": f"thought {i}", "response": f"response {i}"})
+    cluster_engine.fit_clusters(session_memory.load_session_memory(), num_clusters=2)
+
+    entry = session_memory.append_session_entry({"thought": "fresh idea", "response": "a reply"})
+    job_queue.enqueue_entry(entry)
+    assert job_queue.pending_entry_ids() == {entry["id"]}
+
+    job_queue.run_pending()
+
+    stored = session_memory.get_session_entry(entry["id"])
+    assert "alignment" in stored and "cluster" in stored
+    assert memory_engine.load_alignment_stats()["entries"] == 1
+    assert keyword_index.search_ids("fresh") == {entry["id"]}
+    assert job_queue.pending_entry_ids() == set()
+    assert job_queue.job_counts() == {"done": 2}  # The entry job plus one label refresh
+    assert Path(cluster_engine.CLUSTER_LABELS_FILE).exists()
+
+
+def test_failed_jobs_retry_then_stop(queue, monkeypatch):
+    calls = []
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "boom", lambda job: calls.append(job) or 1 / 0)
+    monkeypatch.setattr(job_queue, "RETRY_DELAY", 0)
+
+    job_queue.enqueue_job("boom")
+    job_queue.run_pending()
+
+    assert len(calls) == job_queue.MAX_ATTEMPTS
+    assert job_queue.job_counts() == {"failed": 1}
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_orphaned_running_job_is_reclaimed(queue, monkeypatch, returning):
+    monkeypatch.setattr(job_queue, "HAS_RETURNING", returning)  # False: the SQLite < 3.35 path
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "noop", lambda job: None)
+    job_id = job_queue.enqueue_job("noop")
+    assert job_queue._claim()["id"] == job_id  # Claimed by a worker that then dies
+    assert job_queue._claim() is None
+
+    monkeypatch.setattr(job_queue, "JOB_LEASE_SECONDS", -1)
+    assert job_queue.run_pending() == 1
+    assert job_queue.job_counts() == {"done": 1}
+
+
+def test_old_finished_jobs_are_pruned(queue, monkeypatch):
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "noop", lambda job: None)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "boom", lambda job: 1 / 0)
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 1)
+    job_queue.enqueue_job("noop")
+    job_queue.enqueue_job("boom")
+    job_queue.run_pending()
+    job_queue.enqueue_job("noop")  # Still pending
+
+    assert job_queue.prune_jobs() == 0  # Inside the retention window
+    assert job_queue.prune_jobs(older_than=-1) == 1
+    assert job_queue.job_counts() == {"failed": 1, "pending": 1}
+
+
+def test_entry_job_retries_when_embedding_fails(queue, monkeypatch):
+    monkeypatch.setattr(job_queue, "RETRY_DELAY", 0)
+    create = queue.embeddings.create
+    failures = []
+
+    def flaky_create(**kwargs):
+        if not failures:
+            failures.append(kwargs)
+            raise ConnectionError("embeddings endpoint down")
+        return create(**kwargs)
+
+    monkeypatch.setattr(queue.embeddings, "create", flaky_create)
+    entry = session_memory.append_session_entry({"thought": "fresh idea", "response": "a reply"})
+    job_queue.enqueue_entry(entry)
+    job_queue.run_pending()
+
+    stored = session_memory.get_session_entry(entry["id"])
+    assert len(failures) == 1
+    assert stored["alignment"] == memory_engine.calculate_entry_alignment("fresh idea", "a reply")
+    assert stored["alignment"] != 0.0
+    assert memory_engine.load_alignment_stats()["entries"] == 1
+    assert job_queue.job_counts() == {"done": 1}
@@ -0,0 +1,76 @@
+# tests/test_keyword_index.py
+
+import sys
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import keyword_index
+
+MEMORY = [
+    {"id": 0, "thought": "Feeling stuck in a loop", "response": "Notice the pattern", "tag": "#loop"},
+    {"id": 1, "thought": "Growth feels slow", "response": "Loops can become spirals", "tag": "#growth"},
+    {"id": 2, "thought": "Insight about my mask", "response": "Masks protect", "tag": "#mask #insight"},
+]
+
+
+def _fresh_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_FILE", str(tmp_path / "keyword_index.json"))
+    monkeypatch.setattr(keyword_index, "_indexes", {})
+
+
+def keyword_search(query, field=None):
+    return keyword_index.keyword_search(query, MEMORY, field)
+
+
+def test_prefix_and_field_queries(tmp_path, monkeypatch):
+    _fresh_index(tmp_path, monkeypatch)
+
+    assert [e["id"] for e in keyword_search("loop")] == [0, 1]
+    assert [e["id"] for e in keyword_search("loop", "tag")] == [0]
+    assert [e["id"] for e in keyword_search("mask insi")] == [2]
+    assert keyword_search("loop mask") == []
+
+
+def test_incremental_append_and_persistence(tmp_path, monkeypatch):
+    _fresh_index(tmp_path, monkeypatch)
+    keyword_index.update_keyword_index(MEMORY, save=True)
+
+    monkeypatch.setattr(keyword_index, "_indexes", {})  # Simulate a new process
+    grown = MEMORY + [{"id": 3, "thought": "Another loop today", "response": "", "tag": ""}]
+    assert [e["id"] for e in keyword_index.keyword_search("loop", grown, "thought")] == [0, 3]
+
+
+def test_entries_dropped_by_a_restart_are_caught_up(tmp_path, monkeypatch):
+    _fresh_index(tmp_path, monkeypatch)
+    memory = [{"id": i, "thought": f"word{i}", "response": "", "tag": ""} for i in range(31)]
+    keyword_index.update_keyword_index(memory[:26])  # 0-25: the snapshot taken at SAVE_EVERY
+    keyword_index.update_keyword_index(memory[:30])  # 26-29: indexed but never saved
+
+    monkeypatch.setattr(keyword_index, "_indexes", {})  # Restart
+    keyword_index.update_keyword_index([memory[30]])  # The worker indexes only the new entry
+    assert [e["id"] for e in keyword_index.keyword_search("word27", memory)] == [27]
+
+
+def test_journal_edits_and_removals_refresh_the_index(tmp_path, monkeypatch):
+    from core.memory import session_memory
+
+    _fresh_index(tmp_path, monkeypatch)
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(tmp_path / "memory_store.json"))
+    session_memory.append_session_entries([dict(entry) for entry in MEMORY])
+    memory = session_memory.load_session_memory()
+    assert [e["id"] for e in keyword_index.keyword_search("spiral", memory)] == [1]
+
+    session_memory.update_session_entry(1, {"response": "Loops can become ladders"})
+    memory = session_memory.load_session_memory()
+    assert keyword_index.keyword_search("spiral", memory) == []
+    assert [e["id"] for e in keyword_index.keyword_search("ladder", memory)] == [1]
+
+    memory[0]["thought"] = "Feeling free"
+    session_memory.save_session_memory(memory)
+    assert [e["id"] for e in keyword_index.keyword_search("stuck", session_memory.load_session_memory())] == []
+
+    session_memory.save_session_memory(memory[1:])
+    assert [e["id"] for e in keyword_index.keyword_search("free", session_memory.load_session_memory())] == []
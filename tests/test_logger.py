@@ -0,0 +1,91 @@
+# tests/test_logger.py
+
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils import logger as log
+
+
+def _json_logger(tmp_path, **kwargs):
+    handler = log.BatchedRotatingFileHandler(str(tmp_path / "app.jsonl"), **kwargs)
+    handler.setFormatter(log.JsonFormatter())
+    return log.queued_logger("test.logger", handler), handler
+
+
+def _lines(path):
+    return [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_structured_json(tmp_path):
+    logger, handler = _json_logger(tmp_path)
+    logger.info("saved %s entries", 3, extra={"user": "alice", "entry_id": 7})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    log.flush_logs()
+
+    saved, failed = _lines(handler.baseFilename)
+    assert saved["msg"] == "saved 3 entries" and saved["level"] == "INFO"
+    assert saved["user"] == "alice" and saved["entry_id"] == 7
+    assert failed["level"] == "ERROR" and "ValueError: boom" in failed["exc"]
+
+
+def test_rotates_on_size_and_at_midnight(tmp_path):
+    logger, handler = _json_logger(tmp_path, max_bytes=400, backup_count=5, retention_days=14)
+    for i in range(10):
+        logger.info("x" * 50, extra={"i": i})
+    log.flush_logs()
+    assert Path(handler.baseFilename + ".1").exists()
+    assert Path(handler.baseFilename).stat().st_size <= 400
+    numbered = len(list(tmp_path.glob("app.jsonl.[0-9]")))
+
+    # Midnight: the day's files move under that day's date; old days expire
+    stale = tmp_path / "app.jsonl.2000-01-01"
+    stale.write_text("{}\n", encoding="utf-8")
+    day = time.mktime((2030, 5, 17, 23, 0, 0, 0, 0, -1))
+    os.utime(handler.baseFilename, (day, day))
+    handler._rollover_at = 0
+    logger.info("next day")
+    log.flush_logs()
+
+    assert Path(handler.baseFilename + ".2030-05-17").exists()
+    assert len(list(tmp_path.glob("app.jsonl.2030-05-17.[0-9]"))) == numbered
+    assert not list(tmp_path.glob("app.jsonl.[0-9]")) and not stale.exists()
+    assert [line["msg"] for line in _lines(handler.baseFilename)] == ["next day"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    full = queue.Queue(1)
+    full.put_nowait(None)
+    handler = log._NonBlockingQueueHandler(full)
+    before = log.dropped_records()
+    handler.emit(logging.LogRecord("x", logging.INFO, __file__, 1, "dropped", None, None))
+    assert log.dropped_records() == before + 1
+
+
+def test_log_helpers_keep_their_signature(monkeypatch, tmp_path):
+    handler = log.BatchedRotatingFileHandler(str(tmp_path / "introspect.jsonl"))
+    handler.setFormatter(log.JsonFormatter())
+    monkeypatch.setitem(log._sinks, "IntrospectLogger", [handler])
+
+    log.log_info("Thought submitted and saved.")
+    log.log_error("Error handling input", entry_id=4)
+    log.flush_logs()
+
+    info, error = _lines(handler.baseFilename)
+    assert info["msg"] == "Thought submitted and saved."
+    assert error["level"] == "ERROR" and error["entry_id"] == 4
+    log.log_info("reserved names", name="bob", msg="shadow", args=[1])
+    log.flush_logs()
+    reserved = _lines(handler.baseFilename)[-1]
+    assert reserved["msg"] == "reserved names" and reserved["logger"] == "IntrospectLogger"
+    assert reserved["name"] == "bob" and reserved["fields.msg"] == "shadow" and reserved["args"] == [1]
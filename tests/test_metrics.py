@@ -0,0 +1,81 @@
+# tests/test_metrics.py
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils import metrics
+from utils.logger import flush_logs
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    monkeypatch.setattr(metrics, "METRICS_FILE", "")
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+def test_disabled_spans_are_shared_noops(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    metrics.reset_metrics()
+    with metrics.span("storage.load") as s:
+        s.set(tokens=10)
+    assert s is metrics._NOOP
+    assert metrics.timed("x")(lambda: 3)() == 3
+    assert metrics.summary() == []
+
+
+def test_spans_aggregate_latency_and_counters(enabled):
+    for i in range(20):
+        with metrics.span("openai.chat") as s:
+            s.set(tokens=100, retries=1 if i == 0 else 0)
+            s.add("cache_hits" if i % 4 else "cache_misses")
+    with pytest.raises(ValueError):
+        with metrics.span("openai.chat"):
+            raise ValueError("boom")
+
+    @metrics.timed("storage.load")
+    def load():
+        time.sleep(0.01)
+    load()
+
+    rows = {row["op"]: row for row in metrics.summary()}
+    chat = rows["openai.chat"]
+    assert chat["count"] == 21 and chat["errors"] == 1
+    assert chat["tokens"] == 2000 and chat["retries"] == 1
+    assert chat["cache_hit_rate"] == 0.75
+    assert rows["storage.load"]["p50_ms"] >= 10
+    assert rows["storage.load"]["cache_hit_rate"] is None
+
+
+def test_prometheus_text_format(enabled):
+    metrics.record("search.semantic", 0.02, {"tokens": 5})
+    text = metrics.prometheus_text()
+    assert "# TYPE mindforge_op_latency_seconds summary" in text
+    assert 'mindforge_op_latency_seconds{op="search.semantic",quantile="0.95"} 0.020000' in text
+    assert 'mindforge_op_latency_seconds_count{op="search.semantic"} 1' in text
+    assert 'mindforge_op_tokens_total{op="search.semantic"} 5' in text
+
+
+def test_spans_exported_to_jsonl(enabled, monkeypatch, tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setattr(metrics, "METRICS_FILE", str(path))
+    monkeypatch.setattr(metrics, "_file_logger", None)
+    with metrics.span("embeddings.get", cache_hits=3, cache_misses=1):
+        pass
+    metrics.record("embeddings.get", 0.5, {"error": "Timeout"})
+    flush_logs()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["op"] for line in lines] == ["embeddings.get"] * 2
+    assert lines[0]["cache_hits"] == 3
+    row = metrics.summarize_file(str(path))[0]
+    assert row["count"] == 2 and row["errors"] == 1 and row["cache_hit_rate"] == 0.75
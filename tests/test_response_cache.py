@@ -0,0 +1,58 @@
+# tests/test_response_cache.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from gpt import gpt_handler
+from gpt.response_cache import ResponseCache, cache_key
+from core.memory.fake_client import FakeOpenAIClient
+
+
+def test_key_normalizes_input():
+    assert cache_key("gpt-4", "p", "  Who   am I? ", 0.7) == cache_key("gpt-4", "p", "who am i?", 0.7)
+    assert cache_key("gpt-4", "p", "who am i?", 0.7) != cache_key("gpt-4", "other", "who am i?", 0.7)
+
+
+def test_lru_ttl_and_prompt_invalidation(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl_seconds=10)
+    cache.check_prompt("prompt v1")
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")  # evicts least recently used "b"
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+
+    clock = [1000.0]
+    monkeypatch.setattr("gpt.response_cache.time.time", lambda: clock[0])
+    cache.put("d", "D")
+    clock[0] += 11
+    assert cache.get("d") is None
+
+    cache.put("e", "E")
+    cache.check_prompt("prompt v2")
+    assert len(cache) == 0
+
+
+def test_semantic_tier_reuses_close_inputs():
+    cache = ResponseCache(semantic_threshold=0.95)
+    cache.put("k1", "cached answer", np.array([1.0, 0.0, 0.0]))
+    assert cache.get("other", np.array([0.99, 0.05, 0.0])) == "cached answer"
+    assert cache.get("other", np.array([0.0, 1.0, 0.0])) is None
+
+
+def test_handle_prompt_serves_repeats_from_cache(monkeypatch):
+    client = FakeOpenAIClient(dim=4)
+    monkeypatch.setattr(gpt_handler, "get_client", lambda: client)
+    monkeypatch.setattr(gpt_handler, "RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(gpt_handler, "response_cache", ResponseCache())
+
+    first = gpt_handler.handle_prompt("Why do I repeat this?")
+    streamed = "".join(gpt_handler.stream_prompt("why do I  repeat this?"))
+
+    assert streamed == first
+    assert client.request_count == 1
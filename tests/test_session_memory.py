@@ -0,0 +1,119 @@
+# tests/test_session_memory.py
+
+import json
+import sys
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import keyword_index, session_memory
+
+
+def _use_tmp_store(tmp_path, monkeypatch, legacy=None):
+    legacy_file = tmp_path / "memory_store.json"
+    if legacy is not None:
+        legacy_file.write_text(json.dumps(legacy), encoding="utf-8")
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(legacy_file))
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_FILE", str(tmp_path / "keyword_index.json"))
+    monkeypatch.setattr(keyword_index, "_indexes", {})
+    return tmp_path / "memory_store.jsonl"
+
+
+def test_legacy_store_is_imported_once(tmp_path, monkeypatch):
+    journal = _use_tmp_store(tmp_path, monkeypatch, legacy=[{"thought": "a"}, {"thought": "b"}])
+
+    memory = session_memory.load_session_memory()
+    assert [entry["id"] for entry in memory] == [0, 1]
+
+    (tmp_path / "memory_store.json").write_text("[]", encoding="utf-8")
+    assert len(session_memory.load_session_memory()) == 2
+    assert journal.exists()
+
+
+def test_append_update_and_compact(tmp_path, monkeypatch):
+    journal = _use_tmp_store(tmp_path, monkeypatch)
+
+    for i in range(3):
+        session_memory.append_session_entry({"thought": f"t{i}"})
+    session_memory.update_session_entry(1, {"cluster": 4})
+
+    memory = session_memory.load_session_memory()
+    assert [entry["id"] for entry in memory] == [0, 1, 2]
+    assert memory[1]["cluster"] == 4
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 4
+
+    session_memory.compact_session_memory()
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 3
+    assert session_memory.load_session_memory() == memory
+
+
+def test_torn_tail_is_skipped(tmp_path, monkeypatch):
+    journal = _use_tmp_store(tmp_path, monkeypatch)
+    session_memory.append_session_entry({"thought": "kept"})
+    with journal.open("a", encoding="utf-8") as f:
+        f.write('{"thought": "half-writ')
+
+    session_memory.append_session_entry({"thought": "after crash"})
+    thoughts = [entry["thought"] for entry in session_memory.load_session_memory()]
+    assert thoughts == ["kept", "after crash"]
+
+
+def test_save_session_memory_appends_and_records_changes(tmp_path, monkeypatch):
+    journal = _use_tmp_store(tmp_path, monkeypatch)
+    memory = [{"thought": "a"}, {"thought": "b"}]
+    session_memory.save_session_memory(memory)
+
+    memory[0]["alignment"] = 0.5
+    memory.append({"thought": "c"})
+    session_memory.save_session_memory(memory)
+
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 4
+    assert session_memory.load_session_memory() == memory
+
+
+def test_reload_parses_only_appended_bytes(tmp_path, monkeypatch):
+    _use_tmp_store(tmp_path, monkeypatch)
+    session_memory.append_session_entry({"thought": "first"})
+    session_memory.load_session_memory()
+
+    parsed = []
+    real_loads = session_memory.json.loads
+    monkeypatch.setattr(session_memory.json, "loads", lambda s: parsed.append(s) or real_loads(s))
+
+    assert len(session_memory.load_session_memory()) == 1
+    assert parsed == []
+
+    with open(session_memory.JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": 7, "thought": "from another process"}) + "\n")
+    memory = session_memory.load_session_memory()
+    assert [entry["thought"] for entry in memory] == ["first", "from another process"]
+    assert len(parsed) == 1
+
+    memory[0]["thought"] = "mutated by caller"
+    assert session_memory.load_session_memory()[0]["thought"] == "first"
+
+
+def test_reverse_chronological_pages(tmp_path, monkeypatch):
+    _use_tmp_store(tmp_path, monkeypatch)
+    session_memory.append_session_entries([{"thought": f"t{i}"} for i in range(25)])
+
+    assert session_memory.count_session_entries() == 25
+    assert [e["id"] for e in session_memory.load_session_page(0, 10)] == list(range(24, 14, -1))
+    assert [e["id"] for e in session_memory.load_session_page(20, 10)] == [4, 3, 2, 1, 0]
+    assert session_memory.load_session_page(30, 10) == []
+
+
+def test_edit_heavy_saves_trigger_compaction(tmp_path, monkeypatch):
+    journal = _use_tmp_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(session_memory, "COMPACT_MIN_UPDATES", 5)
+    session_memory.append_session_entries([{"thought": f"t{i}"} for i in range(4)])
+
+    memory = session_memory.load_session_memory()
+    for i in range(20):
+        memory[i % 4]["tag"] = f"#edit{i}"
+        session_memory.save_session_memory(memory)
+
+    assert len(journal.read_text(encoding="utf-8").splitlines()) < 4 + 5
+    assert session_memory.load_session_memory() == memory
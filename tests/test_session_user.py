@@ -0,0 +1,48 @@
+# tests/test_session_user.py
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory.user_storage import DEFAULT_USER, get_current_user, set_current_user
+from utils import session_user
+
+
+def _fake_streamlit(monkeypatch, user=None, query=None):
+    fake = SimpleNamespace(user=user or {}, query_params=query or {}, session_state={})
+    monkeypatch.setattr(session_user, "st", fake)
+    monkeypatch.delenv("MINDFORGE_USER", raising=False)
+    return fake
+
+
+def test_query_param_is_ignored_without_dev_flag(monkeypatch):
+    _fake_streamlit(monkeypatch, query={"user": "alice"})
+    monkeypatch.setattr(session_user, "ALLOW_QUERY_USER", False)
+    try:
+        assert session_user.activate_session_user() == DEFAULT_USER
+        assert get_current_user() == DEFAULT_USER
+    finally:
+        set_current_user(None)
+
+
+def test_authenticated_identity_wins(monkeypatch):
+    _fake_streamlit(monkeypatch, user={"is_logged_in": True, "sub": "oidc-123"}, query={"user": "alice"})
+    monkeypatch.setattr(session_user, "ALLOW_QUERY_USER", True)
+    try:
+        assert session_user.activate_session_user() == "oidc-123"
+    finally:
+        set_current_user(None)
+
+
+def test_dev_flag_allows_query_param(monkeypatch):
+    fake = _fake_streamlit(monkeypatch, query={"user": "alice"})
+    monkeypatch.setattr(session_user, "ALLOW_QUERY_USER", True)
+    try:
+        assert session_user.activate_session_user() == "alice"
+        fake.query_params = {}
+        assert session_user.activate_session_user() == "alice"  # Sticky for the session
+    finally:
+        set_current_user(None)
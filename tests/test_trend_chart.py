@@ -0,0 +1,43 @@
+# tests/test_trend_chart.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils import trend_chart
+
+
+def _trend(scores):
+    dates = pd.date_range("2025-01-01", periods=len(scores), freq="D")
+    return pd.DataFrame({"date": dates, "alignment": np.array(scores, dtype=np.float32)})
+
+
+def test_chart_rendered_once_per_data_change(monkeypatch):
+    trend_chart.clear_chart_cache()
+    renders = []
+    real_render = trend_chart._render_png
+    monkeypatch.setattr(trend_chart, "_render_png", lambda df: renders.append(1) or real_render(df))
+
+    first = trend_chart.trend_chart_png(_trend([0.5, 0.6]))
+    assert first.startswith(b"\x89PNG")
+    assert trend_chart.trend_chart_png(_trend([0.5, 0.6])) is first
+    assert len(renders) == 1
+
+    trend_chart.trend_chart_png(_trend([0.5, 0.7]))
+    assert len(renders) == 2
+
+
+def test_rendering_leaves_no_open_pyplot_figures():
+    import matplotlib.pyplot as plt
+
+    trend_chart.clear_chart_cache()
+    before = len(plt.get_fignums())
+    for i in range(5):
+        trend_chart.trend_chart_png(_trend([0.1 * i, 0.2]))
+    assert len(plt.get_fignums()) == before
+    assert len(trend_chart._charts) <= trend_chart.MAX_CACHED_CHARTS
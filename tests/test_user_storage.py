@@ -0,0 +1,84 @@
+# tests/test_user_storage.py
+
+import multiprocessing
+import sys
+import threading
+from pathlib import Path
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory import session_memory, user_storage
+from core.memory.user_storage import user_context
+
+
+def _use_tmp_shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(user_storage, "USER_DATA_DIR", str(tmp_path / "users"))
+    monkeypatch.setattr(session_memory, "MEMORY_FILE", str(tmp_path / "memory_store.json"))
+    monkeypatch.setattr(session_memory, "JOURNAL_FILE", str(tmp_path / "memory_store.jsonl"))
+
+
+def _append_many(user_id, count):
+    with user_context(user_id):
+        for i in range(count):
+            session_memory.append_session_entry({"thought": f"{user_id}-{i}"})
+
+
+def test_users_are_isolated(tmp_path, monkeypatch):
+    _use_tmp_shards(tmp_path, monkeypatch)
+    _append_many("alice", 2)
+    _append_many("bob", 1)
+
+    with user_context("alice"):
+        assert [e["thought"] for e in session_memory.load_session_memory()] == ["alice-0", "alice-1"]
+    with user_context("bob"):
+        assert [e["id"] for e in session_memory.load_session_memory()] == [0]
+    assert session_memory.load_session_memory() == []  # Default user untouched
+    assert user_storage.user_file("x.json", "../evil").startswith(str(tmp_path / "users"))
+
+
+def test_distinct_ids_never_share_a_shard(tmp_path, monkeypatch):
+    _use_tmp_shards(tmp_path, monkeypatch)
+    ids = ["a@b.com", "a_b.com", "a b.com", "x" * 64 + "1", "x" * 64 + "2", "..", "default"]
+    shards = {user_storage.user_file("x.json", user_id) for user_id in ids}
+    assert len(shards) == len(ids)
+    assert all(shard.startswith(str(tmp_path / "users")) for shard in shards)
+
+    _append_many("default", 1)  # A real account named "default" is not the global store
+    assert session_memory.load_session_memory() == []
+    assert user_storage.user_file("x.json", user_storage.DEFAULT_USER) == "x.json"
+
+
+def test_concurrent_writers_do_not_corrupt_a_shard(tmp_path, monkeypatch):
+    _use_tmp_shards(tmp_path, monkeypatch)
+    threads = [threading.Thread(target=_append_many, args=(user, 25)) for user in ["alice", "alice", "bob"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ctx = multiprocessing.get_context("fork")
+    processes = [ctx.Process(target=_append_many, args=("alice", 25)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with user_context("alice"):
+        ids = [e["id"] for e in session_memory.load_session_memory()]
+    assert sorted(ids) == list(range(100))
+    with user_context("bob"):
+        assert session_memory.count_session_entries() == 25
+
+
+def test_lookups_and_reads_create_no_shard(tmp_path, monkeypatch):
+    _use_tmp_shards(tmp_path, monkeypatch)
+    with user_context("probe"):
+        assert user_storage.user_file("x.json").startswith(str(tmp_path / "users"))
+        assert session_memory.load_session_memory() == []
+        assert session_memory.count_session_entries() == 0
+        assert session_memory.get_session_entry(0) is None
+    assert not (tmp_path / "users").exists()
+
+    _append_many("probe", 1)
+    assert (Path(user_storage.shard_dir("probe")) / "memory_store.jsonl").exists()
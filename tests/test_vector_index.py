@@ -0,0 +1,35 @@
+# tests/test_vector_index.py
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# ✅ Fix import path to project root (/IN_STABLE)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.memory.vector_index import VectorIndex
+
+
+def test_search_matches_brute_force_ranking():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((300, 32)).astype(np.float32)
+    index = VectorIndex()
+    index.add(list(range(100)), vectors[:100])
+    index.add(list(range(100, 300)), vectors[100:])  # grows past initial capacity
+    query = rng.standard_normal(32)
+
+    results = index.search(query, k=5)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+    assert [entry_id for entry_id, _ in results] == list(expected)
+    assert len(index) == 300
+
+
+def test_empty_index_and_zero_query():
+    index = VectorIndex()
+    assert index.search(np.ones(4)) == []
+    index.add(["a"], np.ones((1, 4)))
+    assert index.search(np.zeros(4)) == []
+    assert index.search(np.ones(4), k=10)[0][0] == "a"
@@ -0,0 +1,56 @@
+# utils/file_cache.py
+
+import copy
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+# Process-level cache shared across Streamlit sessions: path -> (signature, value)
+_cache: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+_lock = threading.Lock()
+
+
+def _signature(path: str) -> Tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def load_cached(path, parser: Callable[[str], Any]) -> Any:
+    """
+    Return parser(path), re-running the parser only when the file's
+    inode, size or mtime changed since the last call.
+    Callers must treat the returned object as read-only.
+    """
+    key = os.path.abspath(path)
+    signature = _signature(key)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    value = parser(key)
+    with _lock:
+        _cache[key] = (signature, value)
+    return value
+
+
+def _parse_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_json_cached(path, default: Any = None) -> Any:
+    """Load a JSON file through the cache; returns a private copy (or `default` if missing/invalid)."""
+    try:
+        return copy.deepcopy(load_cached(path, _parse_json))
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def invalidate(path=None) -> None:
+    """Drop one cached file (or everything) so the next load re-parses it."""
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
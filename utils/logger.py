@@ -1,41 +1,278 @@
 # utils/logger.py
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
-# Ensure logs directory exists
 LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
+# Current file. Size rotations during the day get .1, .2, ...; at midnight the day's
+# files are renamed to introspect.jsonl.YYYY-MM-DD[.N], so each file maps to its day.
+LOG_FILE = os.path.join(LOG_DIR, "introspect.jsonl")
+LOG_MAX_BYTES = int(os.getenv("MINDFORGE_LOG_MAX_BYTES", str(10 * 2**20)))
+LOG_BACKUPS = int(os.getenv("MINDFORGE_LOG_BACKUPS", "5"))  # Size rotations kept per day
+LOG_RETENTION_DAYS = int(os.getenv("MINDFORGE_LOG_RETENTION_DAYS", "14"))  # Dated files kept
+LOG_QUEUE_SIZE = 10_000  # Records beyond this are dropped (and counted) rather than blocking the caller
+FLUSH_INTERVAL = 1.0  # Longest a record waits in a batch before it is flushed
+FLUSH_BATCH = 256  # Records that trigger an early flush
 
-# Generate dynamic log file name
-log_file = os.path.join(LOG_DIR, f"introspect_{datetime.now().strftime('%Y-%m-%d')}.log")
+# Attributes every LogRecord has; anything else was passed via `extra` and is exported as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
 
-# Logger setup
-logger = logging.getLogger("IntrospectLogger")
-logger.setLevel(logging.DEBUG)
 
-# File handler
-file_handler = logging.FileHandler(log_file, encoding="utf-8")
-file_handler.setLevel(logging.DEBUG)
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, thread, any extra fields, exc."""
 
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "fields" and not key.startswith("_"):
+                payload[key] = value
+        # log_info/log_error fields; one that shadows a core key is kept under "fields.<key>"
+        for key, value in (getattr(record, "fields", None) or {}).items():
+            payload[f"fields.{key}" if key in payload else key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
 
-# Formatter
-formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s', datefmt='%H:%M:%S')
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
 
-# Attach handlers only once
-if not logger.handlers:
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotates on size (numbered backups) and, optionally, at local midnight
+    (date-suffixed files with their own retention), and only flushes when the
+    listener asks, so a burst of records becomes one write to disk.
+    Size is tracked in memory instead of seeking the file on every record.
+    """
 
-# Exported functions
-def log_info(msg: str):
-    logger.info(msg)
+    def __init__(self, filename: str, max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUPS,
+                 rotate_daily: bool = True, retention_days: int = LOG_RETENTION_DAYS):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_daily = rotate_daily
+        self.retention_days = retention_days
+        self._size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        self._rollover_at = self._next_midnight()
+        if rotate_daily and self._size and os.path.getmtime(self.baseFilename) < self._rollover_at - 86400:
+            self._rollover_at = 0  # Left over from an earlier day: date it before the first write
 
-def log_error(msg: str):
-    logger.error(msg)
+    @staticmethod
+    def _next_midnight() -> float:
+        tomorrow = datetime.now().date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        # The size check happens in emit(), where the encoded line length is known
+        return self.rotate_daily and time.time() >= self._rollover_at
+
+    def doRollover(self) -> None:
+        """Size rotation within the day: file -> .1 -> .2 ... (backupCount kept)."""
+        super().doRollover()
+        self._size = 0
+
+    def rollover_day(self) -> None:
+        """
+        Midnight rotation: the current file and its numbered backups are renamed
+        to <file>.<day>[.N], where <day> is when the current file was last written.
+        Dated files older than retention_days are deleted.
+        """
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        base = self.baseFilename
+        if os.path.exists(base):
+            day = datetime.fromtimestamp(os.path.getmtime(base)).strftime("%Y-%m-%d")
+            dated = f"{base}.{day}"
+            if os.path.exists(dated):  # Restarted after a rotation that day: keep both
+                dated = f"{dated}.{int(time.time())}"
+            os.replace(base, dated)
+            for i in range(1, self.backupCount + 1):
+                if os.path.exists(f"{base}.{i}"):
+                    os.replace(f"{base}.{i}", f"{dated}.{i}")
+        self._size = 0
+        self._rollover_at = self._next_midnight()
+        self._prune_days()
+
+    def _prune_days(self) -> None:
+        if self.retention_days <= 0:
+            return
+        directory, name = os.path.split(self.baseFilename)
+        pattern = re.compile(re.escape(name) + r"\.(\d{4}-\d{2}-\d{2})(\..*)?$")
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for filename in os.listdir(directory):
+            match = pattern.match(filename)
+            if match and match.group(1) < cutoff:
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + self.terminator
+            size = len(line.encode("utf-8"))
+            if self.shouldRollover(record):
+                self.rollover_day()
+            elif self.maxBytes and self._size and self._size + size > self.maxBytes:
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(line)
+            self._size += size
+        except Exception:
+            self.handleError(record)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread; never blocks or touches disk."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later) but keep fields and traceback structured
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+_queue: "queue.Queue[Optional[logging.LogRecord]]" = queue.Queue(LOG_QUEUE_SIZE)
+_sinks: Dict[str, List[logging.Handler]] = {}  # Logger name -> handlers run on the listener thread
+_sinks_lock = threading.Lock()
+_listener: Optional[threading.Thread] = None
+_dropped = 0
+
+
+def _write_batch(records: List[logging.LogRecord]) -> None:
+    with _sinks_lock:
+        sinks = {name: list(handlers) for name, handlers in _sinks.items()}
+    touched = set()
+    for record in records:
+        for handler in sinks.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+                touched.add(handler)
+    for handler in touched:
+        handler.flush()
+
+
+def _listen() -> None:
+    """
+    Collect records for up to FLUSH_INTERVAL (or FLUSH_BATCH records, or the
+    first ERROR) and write them with one flush per sink. None stops the loop.
+    """
+    while True:
+        record = _queue.get()
+        batch: List[logging.LogRecord] = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while record is not None:
+            batch.append(record)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= FLUSH_BATCH or record.levelno >= logging.ERROR or remaining <= 0:
+                break
+            try:
+                record = _queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                _write_batch(batch)
+            except Exception:
+                pass  # A failing sink must not kill the listener
+        if record is None:
+            return
+
+
+def start_logging() -> None:
+    """Start the listener thread (once per process; restarted after stop_logging)."""
+    global _listener
+    with _sinks_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(target=_listen, name="log-writer", daemon=True)
+            _listener.start()
+
+
+def stop_logging(timeout: float = 5.0) -> None:
+    """Write out everything queued so far and stop the listener (runs at exit)."""
+    global _listener
+    thread = _listener
+    if thread is None or not thread.is_alive():
+        return
+    _queue.put(None)
+    thread.join(timeout)
+    _listener = None
+
+
+def flush_logs(timeout: float = 5.0) -> None:
+    """Block until records queued before this call are on disk (tests, shutdown hooks)."""
+    stop_logging(timeout)
+    start_logging()
+
+
+def dropped_records() -> int:
+    return _dropped
+
+
+def queued_logger(name: str, *handlers: logging.Handler, level: int = logging.DEBUG) -> logging.Logger:
+    """
+    A logger whose records are written by `handlers` on the listener thread.
+    Calling it again for the same name replaces (and closes) its old handlers.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.propagate = False
+    if not any(isinstance(h, _NonBlockingQueueHandler) for h in logger.handlers):
+        logger.addHandler(_NonBlockingQueueHandler(_queue))
+    with _sinks_lock:
+        previous = _sinks.get(name, [])
+        _sinks[name] = list(handlers)
+    for handler in previous:
+        handler.close()
+    start_logging()
+    return logger
+
+
+# --- Default application logger: JSON lines to logs/, short text to the console
+_file_handler = BatchedRotatingFileHandler(LOG_FILE)
+_file_handler.setLevel(logging.DEBUG)
+_file_handler.setFormatter(JsonFormatter())
+
+_console_handler = logging.StreamHandler()
+_console_handler.setLevel(logging.INFO)
+_console_handler.setFormatter(logging.Formatter('%(asctime)s | %(levelname)s | %(message)s', datefmt='%H:%M:%S'))
+
+logger = queued_logger("IntrospectLogger", _file_handler, _console_handler)
+atexit.register(stop_logging)
+
+
+# Exported functions; keyword arguments become structured fields on the record.
+# They travel nested under one attribute, so names like `name` or `msg` can't
+# collide with LogRecord attributes (which would raise inside the caller).
+def log_info(msg: str, /, **fields):
+    logger.info(msg, extra={"fields": fields})
+
+def log_error(msg: str, /, **fields):
+    logger.error(msg, extra={"fields": fields})
@@ -0,0 +1,258 @@
+# utils/metrics.py
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Off by default: a disabled span() returns a shared no-op object, so
+# instrumented hot paths pay one function call and one flag check.
+METRICS_ENABLED = os.getenv("MINDFORGE_METRICS", "0") == "1"
+METRICS_PORT = int(os.getenv("MINDFORGE_METRICS_PORT", "0"))  # Prometheus text endpoint; 0 disables
+METRICS_FILE = os.getenv(
+    "MINDFORGE_METRICS_FILE", os.path.join(os.path.dirname(__file__), "..", "logs", "metrics.jsonl")
+)  # Rotating JSONL of every span; "" disables
+METRICS_FILE_MAX_BYTES = 10 * 2**20
+METRICS_FILE_BACKUPS = 5
+WINDOW = 1024  # Recent latencies kept per operation for percentiles
+
+# Numeric span attributes that are summed per operation
+COUNTERS = ("tokens", "retries", "cache_hits", "cache_misses")
+
+_lock = threading.Lock()
+_ops: Dict[str, Dict[str, Any]] = {}
+_file_logger: Optional[logging.Logger] = None
+_server: Optional[ThreadingHTTPServer] = None
+
+
+class Span:
+    """Times one operation; attributes set on it are exported with the span."""
+
+    __slots__ = ("op", "attrs", "start")
+
+    def __init__(self, op: str, attrs: Dict[str, Any]):
+        self.op = op
+        self.attrs = attrs
+        self.start = 0.0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount: float = 1) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        seconds = time.perf_counter() - self.start
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.attrs["error"] = exc_type.__name__
+        record(self.op, seconds, self.attrs)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def add(self, key: str, amount: float = 1) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(op: str, **attrs):
+    """`with span("storage.load") as s: ... s.set(tokens=n)`; a no-op when metrics are off."""
+    if not METRICS_ENABLED:
+        return _NOOP
+    return Span(op, attrs)
+
+
+def timed(op: str):
+    """Decorator form of span() for whole-function timing."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            with Span(op, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable_metrics(enabled: bool = True) -> None:
+    global METRICS_ENABLED
+    METRICS_ENABLED = enabled
+
+
+def reset_metrics() -> None:
+    with _lock:
+        _ops.clear()
+
+# --- Aggregation
+
+def record(op: str, seconds: float, attrs: Optional[Dict[str, Any]] = None) -> None:
+    """Fold one finished span into the per-operation aggregate and the JSONL export."""
+    attrs = attrs or {}
+    with _lock:
+        stats = _ops.get(op)
+        if stats is None:
+            stats = _ops[op] = {"count": 0, "errors": 0, "sum": 0.0,
+                                "latencies": deque(maxlen=WINDOW), **{key: 0 for key in COUNTERS}}
+        stats["count"] += 1
+        stats["sum"] += seconds
+        stats["latencies"].append(seconds)
+        if "error" in attrs:
+            stats["errors"] += 1
+        for key in COUNTERS:
+            value = attrs.get(key)
+            if isinstance(value, (int, float)):
+                stats[key] += value
+
+    logger = _metrics_file_logger()
+    if logger is not None:
+        logger.info(json.dumps({"ts": round(time.time(), 3), "op": op, "ms": round(seconds * 1000, 3), **attrs},
+                               default=str))
+
+
+def _summarize(op: str, count: int, errors: int, latencies, counters: Dict[str, float]) -> Dict[str, Any]:
+    samples = np.fromiter(latencies, dtype=np.float64) * 1000
+    hits, misses = counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+    return {
+        "op": op,
+        "count": count,
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(samples, 50)), 2) if samples.size else 0.0,
+        "p95_ms": round(float(np.percentile(samples, 95)), 2) if samples.size else 0.0,
+        "tokens": int(counters.get("tokens", 0)),
+        "retries": int(counters.get("retries", 0)),
+        "cache_hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+    }
+
+
+def summary() -> List[Dict[str, Any]]:
+    """Per-operation count, p50/p95 (over the last WINDOW spans), tokens, retries and cache hit rate."""
+    with _lock:
+        snapshot = {op: (s["count"], s["errors"], list(s["latencies"]), {k: s[k] for k in COUNTERS})
+                    for op, s in _ops.items()}
+    return [_summarize(op, *values) for op, values in sorted(snapshot.items())]
+
+
+def summarize_file(path: str = METRICS_FILE, limit: int = 20_000) -> List[Dict[str, Any]]:
+    """Same summary built from the tail of a JSONL export (e.g. spans written by another process)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = deque(f, maxlen=limit)
+    except OSError:
+        return []
+    ops: Dict[str, Dict[str, Any]] = {}
+    for line in lines:
+        try:
+            span_record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        stats = ops.setdefault(span_record.get("op", "?"), {"count": 0, "errors": 0, "latencies": [], "counters": {}})
+        stats["count"] += 1
+        stats["errors"] += "error" in span_record
+        stats["latencies"].append(span_record.get("ms", 0) / 1000)
+        for key in COUNTERS:
+            if isinstance(span_record.get(key), (int, float)):
+                stats["counters"][key] = stats["counters"].get(key, 0) + span_record[key]
+    return [_summarize(op, s["count"], s["errors"], s["latencies"], s["counters"]) for op, s in sorted(ops.items())]
+
+# --- Exporters
+
+def _metrics_file_logger() -> Optional[logging.Logger]:
+    """Size-rotated JSONL sink for spans, written off-thread by the log pipeline."""
+    global _file_logger
+    if not METRICS_FILE:
+        return None
+    if _file_logger is None:
+        from utils.logger import BatchedRotatingFileHandler, queued_logger
+
+        with _lock:
+            if _file_logger is None:
+                handler = BatchedRotatingFileHandler(
+                    METRICS_FILE, max_bytes=METRICS_FILE_MAX_BYTES, backup_count=METRICS_FILE_BACKUPS,
+                    rotate_daily=False,
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                _file_logger = queued_logger("IntrospectMetrics", handler, level=logging.INFO)
+    return _file_logger
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text() -> str:
+    """Current aggregates in the Prometheus text exposition format."""
+    with _lock:
+        snapshot = {op: dict(s, latencies=list(s["latencies"])) for op, s in _ops.items()}
+    lines = [
+        "# HELP mindforge_op_latency_seconds Operation latency (quantiles over recent spans).",
+        "# TYPE mindforge_op_latency_seconds summary",
+    ]
+    for op, stats in sorted(snapshot.items()):
+        label = f'op="{_label(op)}"'
+        samples = np.asarray(stats["latencies"], dtype=np.float64)
+        for quantile in (0.5, 0.95):
+            value = float(np.quantile(samples, quantile)) if samples.size else 0.0
+            lines.append(f'mindforge_op_latency_seconds{{{label},quantile="{quantile}"}} {value:.6f}')
+        lines.append(f"mindforge_op_latency_seconds_sum{{{label}}} {stats['sum']:.6f}")
+        lines.append(f"mindforge_op_latency_seconds_count{{{label}}} {stats['count']}")
+    for name in ("errors",) + COUNTERS:
+        lines.append(f"# TYPE mindforge_op_{name}_total counter")
+        for op, stats in sorted(snapshot.items()):
+            lines.append(f'mindforge_op_{name}_total{{op="{_label(op)}"}} {stats[name]:g}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics for Prometheus on a daemon thread (once per process; no-op if disabled)."""
+    global _server
+    if not METRICS_ENABLED or not port:
+        return None
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None  # Another server process already owns the port
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
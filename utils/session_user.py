@@ -0,0 +1,37 @@
+# utils/session_user.py
+
+import os
+
+import streamlit as st
+
+from core.memory.user_storage import DEFAULT_USER, set_current_user
+
+# Dev only: trust `?user=<id>` without authentication (anyone can pick any shard)
+ALLOW_QUERY_USER = os.getenv("MINDFORGE_DEV_QUERY_USER", "0") == "1"
+
+
+def _authenticated_user() -> str:
+    """Stable id of the signed-in user from Streamlit's OIDC login (st.login); '' if none."""
+    try:
+        user = st.user
+        if not user.get("is_logged_in"):
+            return ""
+        return str(user.get("sub") or user.get("email") or "")
+    except Exception:
+        return ""  # Auth not configured in .streamlit/secrets.toml
+
+
+def activate_session_user() -> str:
+    """
+    Route this script run's storage calls to the session's user shard.
+    The id comes from the authenticated identity (st.login / st.user), then
+    the server's MINDFORGE_USER, else the default single-user store. The
+    `?user=` query parameter is honoured only with MINDFORGE_DEV_QUERY_USER=1.
+    """
+    user_id = _authenticated_user()
+    if not user_id and ALLOW_QUERY_USER:
+        user_id = st.query_params.get("user") or st.session_state.get("dev_user_id")
+        st.session_state["dev_user_id"] = user_id  # Sticky across reruns in dev
+    user_id = set_current_user(user_id or os.getenv("MINDFORGE_USER") or DEFAULT_USER)
+    st.session_state["user_id"] = user_id
+    return user_id
@@ -0,0 +1,38 @@
+# utils/timeline.py
+
+import math
+from typing import Any, Callable, Dict, List
+
+import streamlit as st
+
+PageFetcher = Callable[[int, int], List[Dict[str, Any]]]  # (offset, limit) -> newest-first entries
+
+
+def list_page_fetcher(entries: List[Dict[str, Any]]) -> PageFetcher:
+    """Newest-first pages over an in-memory (e.g. filtered) list."""
+    def fetch(offset: int, limit: int) -> List[Dict[str, Any]]:
+        end = max(len(entries) - offset, 0)
+        return list(reversed(entries[max(end - limit, 0):end]))
+    return fetch
+
+
+def render_entry(entry: Dict[str, Any]) -> None:
+    tag = f" · 🏷️ *{entry['tag']}*" if entry.get("tag") else ""
+    st.markdown(f"---\n**{entry.get('timestamp', '')}**{tag}")
+    st.code(f"🗯️ {entry.get('thought', '')}")
+    st.success(f"🔁 {entry.get('response', '')}")
+
+
+def render_timeline(fetch_page: PageFetcher, total: int, key: str, page_size: int = 10) -> None:
+    """
+    Paginated, newest-first journal timeline. Only the visible page is
+    fetched and rendered, so element count per rerun stays constant.
+    """
+    if total <= 0:
+        return
+    pages = math.ceil(total / page_size)
+    page = 1
+    if pages > 1:
+        page = int(st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page"))
+    for entry in fetch_page((page - 1) * page_size, page_size):
+        render_entry(entry)
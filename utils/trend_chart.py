@@ -0,0 +1,72 @@
+# utils/trend_chart.py
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_CACHED_CHARTS = 8  # Distinct trend states kept as rendered PNGs
+CHART_DPI = 100
+
+_lock = threading.Lock()
+_charts: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def trend_hash(trend_df: pd.DataFrame) -> str:
+    """Content hash of the daily aggregates (date + alignment columns)."""
+    dates = trend_df["date"].to_numpy(dtype="datetime64[ns]")
+    scores = trend_df["alignment"].to_numpy(dtype=np.float32)
+    digest = hashlib.sha256(dates.tobytes())
+    digest.update(scores.tobytes())
+    return digest.hexdigest()
+
+
+def _render_png(trend_df: pd.DataFrame) -> bytes:
+    """
+    Draw the chart on a standalone Figure (not registered with pyplot, so
+    nothing accumulates in its global figure manager) and release it after.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.subplots()
+        ax.plot(trend_df["date"], trend_df["alignment"], marker='o', linestyle='-')
+        ax.set_title("Daily RCA Alignment Score")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Avg RCA Score")
+        ax.grid(True)
+        fig.autofmt_xdate()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=CHART_DPI)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def trend_chart_png(trend_df: pd.DataFrame) -> bytes:
+    """PNG of the RCA trend, re-rendered only when the daily aggregates change."""
+    key = trend_hash(trend_df)
+    with _lock:
+        png = _charts.get(key)
+        if png is not None:
+            _charts.move_to_end(key)
+            return png
+
+    png = _render_png(trend_df)
+    with _lock:
+        _charts[key] = png
+        while len(_charts) > MAX_CACHED_CHARTS:
+            _charts.popitem(last=False)
+    return png
+
+
+def clear_chart_cache() -> None:
+    with _lock:
+        _charts.clear()